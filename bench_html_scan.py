@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: first-iframe lookup with BeautifulSoup vs html_scan
+Usage:
+    python bench_html_scan.py pages/*.html     # recorded VK pages
+    python bench_html_scan.py                  # synthetic VK-like page
+Reports parse time (best of N) and peak traced memory per page
+"""
+
+import sys
+import time
+import argparse
+import tracemalloc
+
+from html_scan import find_first_iframe
+
+try:
+    from bs4 import BeautifulSoup
+except ImportError:
+    BeautifulSoup = None
+
+
+def soup_first_iframe(html):
+    """The lookup video.py used to do"""
+    iframe = BeautifulSoup(html, 'html.parser').find('iframe')
+    src = iframe.get('src') if iframe else None
+    if src and src.startswith('//'):
+        src = 'https:' + src
+    return src
+
+
+def synthetic_vk_page(scripts=40, script_kb=24):
+    """A large script-heavy page with the player iframe near the end, like VK's"""
+    blob = ('var playerParams = {"hls":"https:\\/\\/vkvd.example\\/video.m3u8","cache":[' +
+            ','.join(f'{{"id":{i},"t":"<div class=\\"x\\">{i}</div>"}}' for i in range(200)) + ']};\n')
+    script = (blob * (script_kb * 1024 // len(blob) + 1))[:script_kb * 1024]
+    parts = ['<!DOCTYPE html><html><head><title>VK</title>']
+    parts += [f'<script type="text/javascript">{script}</script>' for _ in range(scripts // 2)]
+    parts.append('</head><body>')
+    parts += [f'<div class="row" data-i="{i}"><a href="/v{i}">item {i}</a></div>' for i in range(2000)]
+    parts += [f'<script>{script}</script>' for _ in range(scripts // 2)]
+    parts.append('<iframe src="//vk.com/video_ext.php?oid=1&id=2&hash=abc" allowfullscreen></iframe>')
+    parts.append('<div class="footer">' + '<span>x</span>' * 3000 + '</div></body></html>')
+    return ''.join(parts)
+
+
+def measure(func, html, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(html)
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    func(html)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, best, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark first-iframe extraction")
+    parser.add_argument("pages", nargs="*", help="recorded HTML pages")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    pages = []
+    for path in args.pages:
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            pages.append((path, f.read()))
+    if not pages:
+        pages.append(("synthetic", synthetic_vk_page()))
+
+    if BeautifulSoup is None:
+        print("⚠️ beautifulsoup4 not installed - measuring html_scan only (pip install beautifulsoup4)")
+
+    print(f"{'PAGE':<30} {'KB':>7} {'METHOD':<8} {'TIME':>9} {'PEAK MEM':>10}")
+    for name, html in pages:
+        label = name if len(name) <= 30 else "…" + name[-29:]
+        size_kb = len(html.encode('utf-8')) / 1024
+
+        scan_result, scan_time, scan_peak = measure(find_first_iframe, html, args.repeat)
+        print(f"{label:<30} {size_kb:>7.0f} {'scan':<8} {scan_time * 1000:>7.1f}ms {scan_peak / 1024:>8.0f}KB")
+
+        if BeautifulSoup is None:
+            continue
+        soup_result, soup_time, soup_peak = measure(soup_first_iframe, html, args.repeat)
+        print(f"{'':<30} {'':>7} {'bs4':<8} {soup_time * 1000:>7.1f}ms {soup_peak / 1024:>8.0f}KB")
+
+        same = "✅ same iframe" if soup_result == scan_result else f"❌ differs: {soup_result} vs {scan_result}"
+        speedup = soup_time / scan_time if scan_time else float('inf')
+        print(f"{'':<30} {'':>7} saved {(soup_time - scan_time) * 1000:.1f}ms ({speedup:.1f}x), "
+              f"{(soup_peak - scan_peak) / 1024:.0f}KB - {same}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Per-stage checkpoints - record each finished stage of an episode so a retry
+(same run or a later one) resumes at the first stage that didn't finish
+Stages: url -> download -> thumbnail -> compress; the artifacts live in the
+episode's working dir next to checkpoint.json
+"""
+
+import os
+import json
+import time
+
+from prefetch import parse_url_expiry, EXPIRY_MARGIN
+from integrity import file_sha256
+
+CHECKPOINT_DIR = os.environ.get("CHECKPOINT_DIR", "checkpoints")
+CHECKPOINT_FILE = "checkpoint.json"
+
+STAGE_URL = "url"
+STAGE_DOWNLOAD = "download"
+STAGE_THUMBNAIL = "thumbnail"
+STAGE_COMPRESS = "compress"
+STAGES = [STAGE_URL, STAGE_DOWNLOAD, STAGE_THUMBNAIL, STAGE_COMPRESS]
+
+
+class Checkpoint:
+    """Stage records of one job, stored as JSON in its working dir"""
+
+    def __init__(self, work_path):
+        self.path = os.path.join(work_path, CHECKPOINT_FILE)
+        self.stages = {}
+        self.verified = set()
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.stages = json.load(f)
+        except:
+            pass
+
+    def save(self):
+        tmp = self.path + ".tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(self.stages, f, ensure_ascii=False, indent=2)
+        os.replace(tmp, self.path)
+
+    def get(self, stage):
+        """The stage record if it finished and its artifact is still intact, else None"""
+        record = self.stages.get(stage)
+        if not record:
+            return None
+
+        # The artifact must still be there, untouched
+        file_path = record.get("file")
+        if file_path:
+            if not os.path.exists(file_path) or os.path.getsize(file_path) != record.get("size"):
+                return None
+            # Same size isn't enough for a download resumed from an earlier run - check the hash once
+            if record.get("sha256") and stage not in self.verified:
+                if file_sha256(file_path) != record["sha256"]:
+                    print(f"⚠️ Checkpointed {stage} file changed on disk, redoing the stage")
+                    return None
+                self.verified.add(stage)
+
+        # Signed URLs are only worth reusing while they are valid
+        if stage == STAGE_URL:
+            expiry = parse_url_expiry(record.get("url"), record.get("time"))
+            if expiry and expiry - time.time() < EXPIRY_MARGIN:
+                return None
+
+        return record
+
+    def done(self, stage, file=None, **data):
+        """Record a finished stage (with its artifact's size, so tampering is noticed)"""
+        record = dict(data, time=time.time())
+        if file:
+            record["file"] = file
+            record["size"] = os.path.getsize(file)
+        self.stages[stage] = record
+        if record.get("sha256"):
+            self.verified.add(stage)
+        try:
+            self.save()
+        except Exception as e:
+            print(f"⚠️ Cannot save checkpoint: {e}")
+        return record
+
+    def invalidate(self, stage):
+        if self.stages.pop(stage, None) is not None:
+            try:
+                self.save()
+            except:
+                pass
+
+    def finished(self):
+        """Names of stages that can be skipped"""
+        return [stage for stage in STAGES if self.get(stage)]
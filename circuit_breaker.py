@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Per-domain circuit breaker - skip mirrors that are down or blocked
+After `threshold` consecutive connection failures / 5xx responses a domain is
+skipped for `cooldown` seconds, then one probe request is let through
+"""
+
+import time
+import threading
+from urllib.parse import urlparse
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half-open"
+
+
+def domain_of(url):
+    return urlparse(url).netloc.lower()
+
+
+class CircuitBreaker:
+    """Consecutive-failure breaker keyed by domain, shared across episodes"""
+
+    def __init__(self, threshold=3, cooldown=120):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.lock = threading.Lock()
+        self.domains = {}
+        self.trips = []
+
+    def _entry(self, domain):
+        return self.domains.setdefault(domain, {
+            'state': STATE_CLOSED,
+            'failures': 0,
+            'opened_at': 0.0,
+            'skipped': 0,
+        })
+
+    def reset(self):
+        """Forget all domains and trips (start of a new job in a long-running process)"""
+        with self.lock:
+            self.domains.clear()
+            self.trips.clear()
+
+    def allow(self, url):
+        """Should a request to this URL's domain be attempted?"""
+        domain = domain_of(url)
+        with self.lock:
+            entry = self._entry(domain)
+            if entry['state'] == STATE_CLOSED:
+                return True
+            if time.time() - entry['opened_at'] >= self.cooldown:
+                # Let one probe through (again, if the last probe never reported back)
+                entry['state'] = STATE_HALF_OPEN
+                entry['opened_at'] = time.time()
+                print(f"🔌 Probing {domain} after cool-down")
+                return True
+            entry['skipped'] += 1
+            return False
+
+    def is_open(self, url):
+        """Check without consuming a probe (for callers that can't report results)"""
+        with self.lock:
+            entry = self.domains.get(domain_of(url))
+            return bool(entry) and entry['state'] != STATE_CLOSED and \
+                time.time() - entry['opened_at'] < self.cooldown
+
+    def record_success(self, url):
+        domain = domain_of(url)
+        with self.lock:
+            entry = self._entry(domain)
+            if entry['state'] != STATE_CLOSED:
+                print(f"✅ {domain} is back, closing breaker")
+            entry['state'] = STATE_CLOSED
+            entry['failures'] = 0
+
+    def record_failure(self, url, reason=""):
+        domain = domain_of(url)
+        with self.lock:
+            entry = self._entry(domain)
+            entry['failures'] += 1
+            if entry['state'] == STATE_HALF_OPEN or (
+                    entry['state'] == STATE_CLOSED and entry['failures'] >= self.threshold):
+                entry['state'] = STATE_OPEN
+                entry['opened_at'] = time.time()
+                self.trips.append({'domain': domain, 'time': entry['opened_at'], 'reason': reason})
+                print(f"⛔ Circuit open for {domain} ({reason}), skipping for {self.cooldown}s")
+
+    def record_response(self, url, status_code):
+        """5xx counts as a failure; anything else means the domain is up"""
+        if status_code >= 500:
+            self.record_failure(url, f"HTTP {status_code}")
+        else:
+            self.record_success(url)
+
+    def print_summary(self):
+        if not self.trips:
+            return
+        print("⛔ Circuit breaker trips:")
+        with self.lock:
+            for domain, entry in self.domains.items():
+                trips = sum(1 for t in self.trips if t['domain'] == domain)
+                if trips:
+                    print(f"  • {domain}: {trips} trip(s), {entry['skipped']} request(s) skipped, now {entry['state']}")
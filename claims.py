@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Work claiming - split an episode range across several runners/processes
+Static shards (SHARD_INDEX / SHARD_COUNT, e.g. a GitHub Actions matrix) and,
+when workers share a disk, a SQLite claim table with expiring leases so a
+crashed worker's episodes are picked up by the others
+"""
+
+import os
+import time
+import socket
+import sqlite3
+import asyncio
+
+CLAIM_DB = os.environ.get("CLAIM_DB", "")
+WORKER_ID = os.environ.get("WORKER_ID") or f"{socket.gethostname()}-{os.getpid()}"
+LEASE_SECONDS = int(os.environ.get("CLAIM_LEASE_SECONDS", "900"))
+MAX_ATTEMPTS = int(os.environ.get("CLAIM_MAX_ATTEMPTS", "3"))
+# How often idle workers look again while other workers hold leases
+CLAIM_POLL_SECONDS = int(os.environ.get("CLAIM_POLL_SECONDS", "30"))
+
+SHARD_INDEX = int(os.environ.get("SHARD_INDEX", "0") or 0)
+SHARD_COUNT = int(os.environ.get("SHARD_COUNT", "1") or 1)
+
+STATUS_CLAIMED = "claimed"
+STATUS_DONE = "done"
+STATUS_FAILED = "failed"
+
+
+def shard_items(items, index=SHARD_INDEX, count=SHARD_COUNT):
+    """Round-robin shard of items (every runner gets early and late episodes)"""
+    items = list(items)
+    if count <= 1:
+        return items
+    if not 0 <= index < count:
+        raise ValueError(f"SHARD_INDEX {index} out of range for SHARD_COUNT {count}")
+    return items[index::count]
+
+
+class ClaimTable:
+    """Atomic claims on (job, item) with leases that expire"""
+
+    def __init__(self, path=CLAIM_DB, worker_id=WORKER_ID, lease_seconds=LEASE_SECONDS,
+                 max_attempts=MAX_ATTEMPTS):
+        self.path = path
+        self.worker_id = worker_id
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        with self._connect() as db:
+            db.execute("""CREATE TABLE IF NOT EXISTS claims (
+                job TEXT NOT NULL,
+                item INTEGER NOT NULL,
+                worker TEXT,
+                status TEXT NOT NULL,
+                lease_until REAL NOT NULL DEFAULT 0,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                message TEXT,
+                PRIMARY KEY (job, item))""")
+
+    def _connect(self):
+        # isolation_level=None: transactions are managed by hand (BEGIN IMMEDIATE)
+        db = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        db.execute("PRAGMA journal_mode=WAL")
+        return db
+
+    def claim(self, job, items):
+        """Claim the first free item (never claimed, lease expired, or failed with attempts left)"""
+        now = time.time()
+        db = self._connect()
+        try:
+            # BEGIN IMMEDIATE takes the write lock, so two workers can't claim the same item
+            db.execute("BEGIN IMMEDIATE")
+            rows = {row[0]: row[1:] for row in db.execute(
+                "SELECT item, status, lease_until, attempts FROM claims WHERE job = ?", (job,))}
+
+            for item in items:
+                row = rows.get(item)
+                if row:
+                    status, lease_until, attempts = row
+                    if status == STATUS_DONE or attempts >= self.max_attempts:
+                        continue
+                    if status == STATUS_CLAIMED and lease_until > now:
+                        continue
+                    if status == STATUS_CLAIMED:
+                        print(f"⌛ Lease on item {item} expired, reclaiming")
+
+                db.execute("""INSERT INTO claims (job, item, worker, status, lease_until, attempts)
+                              VALUES (?, ?, ?, ?, ?, 1)
+                              ON CONFLICT (job, item) DO UPDATE SET
+                                  worker = excluded.worker, status = excluded.status,
+                                  lease_until = excluded.lease_until, attempts = attempts + 1""",
+                           (job, item, self.worker_id, STATUS_CLAIMED, now + self.lease_seconds))
+                db.execute("COMMIT")
+                return item
+
+            db.execute("COMMIT")
+            return None
+        except:
+            if db.in_transaction:
+                db.execute("ROLLBACK")
+            raise
+        finally:
+            db.close()
+
+    def next_lease_expiry(self, job, items):
+        """Earliest expiry among other workers' live leases that could still come back to us
+
+        None when nothing is left: every item is done, out of attempts, or claimable right now.
+        """
+        db = self._connect()
+        try:
+            rows = db.execute("""SELECT item, lease_until FROM claims
+                                 WHERE job = ? AND status = ? AND attempts < ?""",
+                              (job, STATUS_CLAIMED, self.max_attempts)).fetchall()
+        finally:
+            db.close()
+        wanted = set(items)
+        expiries = [lease_until for item, lease_until in rows if item in wanted]
+        return min(expiries) if expiries else None
+
+    def renew(self, job, item):
+        """Extend our lease; False if another worker took the item over"""
+        db = self._connect()
+        try:
+            cursor = db.execute("""UPDATE claims SET lease_until = ?
+                                   WHERE job = ? AND item = ? AND worker = ? AND status = ?""",
+                                (time.time() + self.lease_seconds, job, item, self.worker_id, STATUS_CLAIMED))
+            return cursor.rowcount == 1
+        finally:
+            db.close()
+
+    def complete(self, job, item, success, message=""):
+        db = self._connect()
+        try:
+            db.execute("""UPDATE claims SET status = ?, lease_until = 0, message = ?
+                          WHERE job = ? AND item = ? AND worker = ?""",
+                       (STATUS_DONE if success else STATUS_FAILED, message, job, item, self.worker_id))
+        finally:
+            db.close()
+
+    async def hold(self, job, item):
+        """Renew the lease until cancelled (run as a task while the item is processed)"""
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            if not await asyncio.to_thread(self.renew, job, item):
+                print(f"⚠️ Lost the lease on item {item}")
+                return
+
+    def summary(self, job):
+        """{status: count} for a job"""
+        db = self._connect()
+        try:
+            return dict(db.execute("SELECT status, COUNT(*) FROM claims WHERE job = ? GROUP BY status", (job,)))
+        finally:
+            db.close()
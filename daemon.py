@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Daemon mode - pay the startup cost once, then consume a local job queue
+Keeps the Telegram client, the cloudscraper sessions and the headless
+browser warm between jobs. Jobs are JSON files in a queue directory:
+
+    python daemon.py enqueue series_config.json   # series range
+    python daemon.py enqueue video_config.json    # movie batch ("videos" list)
+    python daemon.py status
+    python daemon.py                              # run until Ctrl+C
+
+One daemon per queue directory: jobs left in running/ by a crash are put
+back in pending/ on startup
+"""
+
+import os
+import json
+import time
+import asyncio
+import argparse
+from datetime import datetime
+
+JOB_QUEUE_DIR = os.environ.get("JOB_QUEUE_DIR", "jobs")
+JOB_POLL_SECONDS = int(os.environ.get("JOB_POLL_SECONDS", "5"))
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+JOB_SERIES = "series"
+JOB_MOVIES = "movies"
+
+
+def queue_path(state, name=""):
+    return os.path.join(JOB_QUEUE_DIR, state, name)
+
+
+def ensure_queue():
+    for state in (PENDING, RUNNING, DONE, FAILED):
+        os.makedirs(queue_path(state), exist_ok=True)
+
+
+def job_type(job):
+    return job.get("type") or (JOB_MOVIES if "videos" in job else JOB_SERIES)
+
+
+def enqueue(config_file):
+    """Copy a series/movie config into the queue (write + rename, so the daemon never sees half a file)"""
+    ensure_queue()
+    with open(config_file, 'r', encoding='utf-8') as f:
+        job = json.load(f)
+    job["type"] = job_type(job)
+
+    name = f"{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}_{job['type']}.json"
+    tmp = queue_path(PENDING, "." + name)
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(job, f, ensure_ascii=False, indent=2)
+    os.replace(tmp, queue_path(PENDING, name))
+    print(f"📥 Queued {job['type']} job: {name}")
+    return name
+
+
+def print_status():
+    ensure_queue()
+    for state in (PENDING, RUNNING, DONE, FAILED):
+        names = sorted(n for n in os.listdir(queue_path(state)) if n.endswith(".json"))
+        print(f"{state:>8}: {len(names)}")
+        if state in (PENDING, RUNNING):
+            for name in names:
+                print(f"          {name}")
+
+
+def recover_running():
+    """Put back jobs a previous daemon was running when it died"""
+    for name in os.listdir(queue_path(RUNNING)):
+        if name.endswith(".json"):
+            os.replace(queue_path(RUNNING, name), queue_path(PENDING, name))
+            print(f"♻️ Re-queued interrupted job: {name}")
+
+
+def claim_next_job():
+    """Move the oldest pending job to running/; None when the queue is empty"""
+    for name in sorted(os.listdir(queue_path(PENDING))):
+        if not name.endswith(".json") or name.startswith("."):
+            continue
+        try:
+            os.replace(queue_path(PENDING, name), queue_path(RUNNING, name))
+        except FileNotFoundError:
+            continue
+        return name
+    return None
+
+
+def finish_job(name, job, result, ok):
+    job["result"] = result
+    target = queue_path(DONE if ok else FAILED, name)
+    with open(target, 'w', encoding='utf-8') as f:
+        json.dump(job, f, ensure_ascii=False, indent=2)
+    os.remove(queue_path(RUNNING, name))
+
+
+async def run_daemon():
+    # Importing the scripts validates env and installs requirements - once per daemon
+    import main as series
+    import video as movies
+    import metrics
+
+    print("="*50)
+    print("🛰️ Uploader daemon")
+    print(f"📂 Queue: {os.path.abspath(JOB_QUEUE_DIR)}")
+    print("="*50)
+
+    metrics.start_server()
+    series.check_dependencies()
+
+    if not await series.setup_telegram():
+        print("❌ Cannot continue without Telegram connection")
+        return
+    # One Telegram connection for both kinds of jobs
+    movies.app = series.app
+
+    ensure_queue()
+    recover_running()
+
+    idle_since = None
+    try:
+        while True:
+            name = claim_next_job()
+            if name is None:
+                if idle_since is None:
+                    idle_since = time.time()
+                    print(f"💤 Waiting for jobs in {queue_path(PENDING)}")
+                await asyncio.sleep(JOB_POLL_SECONDS)
+                continue
+            idle_since = None
+
+            try:
+                with open(queue_path(RUNNING, name), 'r', encoding='utf-8') as f:
+                    job = json.load(f)
+            except Exception as e:
+                print(f"❌ Unreadable job {name}: {e}")
+                os.replace(queue_path(RUNNING, name), queue_path(FAILED, name))
+                continue
+
+            kind = job_type(job)
+            print(f"\n{'='*50}")
+            print(f"🚀 Job {name} ({kind})")
+            print('='*50)
+
+            start = time.time()
+            try:
+                if kind == JOB_MOVIES:
+                    successful, total = await movies.run_movies(job)
+                else:
+                    successful, total = await series.run_series(job)
+                error = None
+            except Exception as e:
+                successful, total, error = 0, 0, f"{type(e).__name__}: {e}"
+                print(f"💥 Job error: {error}")
+
+            elapsed = time.time() - start
+            ok = error is None and total > 0 and successful == total
+            finish_job(name, job, {
+                'successful': successful,
+                'total': total,
+                'error': error,
+                'seconds': round(elapsed, 1),
+                'finished': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            }, ok)
+            print(f"{'✅' if ok else '❌'} Job {name}: {successful}/{total} in {elapsed:.0f}s")
+    finally:
+        series.close_driver()
+        if series.app:
+            await series.app.stop()
+            print("🔌 Telegram connection closed")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Uploader daemon / job queue")
+    sub = parser.add_subparsers(dest="command")
+    add = sub.add_parser("enqueue", help="queue a series_config.json / video_config.json")
+    add.add_argument("config_files", nargs="+")
+    sub.add_parser("status", help="show queue contents")
+    args = parser.parse_args()
+
+    if args.command == "enqueue":
+        for config_file in args.config_files:
+            enqueue(config_file)
+    elif args.command == "status":
+        print_status()
+    else:
+        try:
+            asyncio.run(run_daemon())
+        except KeyboardInterrupt:
+            print("\n⏹️ Daemon stopped")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,388 @@
+#!/usr/bin/env python3
+"""
+Encoding Profiles - x264/AAC settings shared by main.py and video.py
+Autotune benchmarks presets on a sample clip and saves the fastest profile
+that meets a size-per-minute target
+
+Usage:
+    python encoding_profiles.py list
+    python encoding_profiles.py show
+    python encoding_profiles.py autotune <video_file> [--target-mb-per-min 4.0]
+                                          [--sample-seconds 30] [--start 60]
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import itertools
+import subprocess
+from datetime import datetime
+
+# Saved profile (written by autotune, read by both scripts)
+PROFILE_FILE = os.environ.get("ENCODING_PROFILE_FILE", "encoding_profile.json")
+
+# Profile registry - "veryfast-crf28" is the original hard-coded setting
+PROFILES = {
+    "veryfast-crf28": {
+        "preset": "veryfast",
+        "crf": 28,
+        "tune": None,
+        "threads": 0,
+        "audio_bitrate": "64k",
+    },
+    "superfast-crf28": {
+        "preset": "superfast",
+        "crf": 28,
+        "tune": None,
+        "threads": 0,
+        "audio_bitrate": "64k",
+    },
+    "ultrafast-crf30": {
+        "preset": "ultrafast",
+        "crf": 30,
+        "tune": None,
+        "threads": 0,
+        "audio_bitrate": "64k",
+    },
+    "faster-crf28": {
+        "preset": "faster",
+        "crf": 28,
+        "tune": None,
+        "threads": 0,
+        "audio_bitrate": "64k",
+    },
+    "fast-crf30": {
+        "preset": "fast",
+        "crf": 30,
+        "tune": None,
+        "threads": 0,
+        "audio_bitrate": "48k",
+    },
+}
+
+DEFAULT_PROFILE = "veryfast-crf28"
+
+# Autotune search space
+AUTOTUNE_PRESETS = ["ultrafast", "superfast", "veryfast", "faster"]
+AUTOTUNE_TUNES = [None, "fastdecode", "zerolatency"]
+AUTOTUNE_CRF = 28
+AUTOTUNE_TARGET_MB_PER_MIN = 4.0
+
+
+def get_profile(name):
+    """Get a profile from the registry by name"""
+    if name not in PROFILES:
+        return None
+    profile = dict(PROFILES[name])
+    profile["name"] = name
+    return profile
+
+
+def load_profile():
+    """Load the active profile (ENCODING_PROFILE env > saved file > default)"""
+    name = os.environ.get("ENCODING_PROFILE", "").strip()
+    if name:
+        profile = get_profile(name)
+        if profile:
+            return profile
+        print(f"⚠️ Unknown ENCODING_PROFILE '{name}', ignoring")
+
+    if os.path.exists(PROFILE_FILE):
+        try:
+            with open(PROFILE_FILE, 'r', encoding='utf-8') as f:
+                saved = json.load(f)
+            profile = get_profile(DEFAULT_PROFILE)
+            for key in ("name", "preset", "crf", "tune", "threads", "audio_bitrate"):
+                if key in saved:
+                    profile[key] = saved[key]
+            return profile
+        except Exception as e:
+            print(f"⚠️ Cannot read {PROFILE_FILE}: {e}")
+
+    return get_profile(DEFAULT_PROFILE)
+
+
+def build_encode_args(profile=None):
+    """Build ffmpeg codec arguments for a profile"""
+    if profile is None:
+        profile = load_profile()
+
+    args = [
+        '-c:v', 'libx264',
+        '-crf', str(profile["crf"]),
+        '-preset', profile["preset"],
+    ]
+    if profile.get("tune"):
+        args += ['-tune', profile["tune"]]
+    if profile.get("threads"):
+        args += ['-threads', str(profile["threads"])]
+    args += [
+        '-c:a', 'aac',
+        '-b:a', profile["audio_bitrate"],
+    ]
+    return args
+
+
+def describe_profile(profile):
+    """One-line description of a profile"""
+    text = f"{profile.get('name', 'custom')} (preset={profile['preset']}, crf={profile['crf']}"
+    if profile.get("tune"):
+        text += f", tune={profile['tune']}"
+    if profile.get("threads"):
+        text += f", threads={profile['threads']}"
+    return text + f", audio={profile['audio_bitrate']})"
+
+
+# ===== OUTPUT LADDER =====
+
+def parse_output_ladder(value, default_channel):
+    """Normalise an output ladder config: [240, 360] or [{"height": 240, "channel": "@x"}, ...]
+
+    Empty when no ladder is configured (the plain 240p path is used then).
+    """
+    ladder = []
+    for entry in value or []:
+        if isinstance(entry, dict):
+            height = int(entry.get("height", 240))
+            channel = entry.get("channel") or default_channel
+        else:
+            height, channel = int(entry), default_channel
+        if all(r["height"] != height for r in ladder):
+            ladder.append({"height": height, "channel": channel})
+    return ladder
+
+
+def build_ladder_command(input_file, outputs, profile=None):
+    """One ffmpeg command: decode once, split, scale and encode every rendition
+
+    outputs: list of (height, output_file)
+    """
+    codec_args = build_encode_args(profile)
+    labels = [f"v{i}" for i in range(len(outputs))]
+
+    # Never upscale: a rendition taller than the source keeps the source height
+    graph = f"[0:v]split={len(outputs)}" + "".join(f"[{l}]" for l in labels)
+    for label, (height, _) in zip(labels, outputs):
+        graph += f";[{label}]scale=-2:'min({height},ih)'[{label}out]"
+
+    cmd = ['ffmpeg', '-i', input_file, '-filter_complex', graph]
+    for label, (_, output_file) in zip(labels, outputs):
+        cmd += ['-map', f'[{label}out]', '-map', '0:a?']
+        cmd += codec_args
+        cmd += ['-y', output_file]
+    return cmd
+
+
+def encode_ladder(input_file, outputs, profile=None, on_progress=None, timeout=None):
+    """Encode every rendition from a single decode; returns {height: ok}"""
+    from ffmpeg_progress import run_ffmpeg
+
+    profile = profile or load_profile()
+    print(f"🪜 Encoding {len(outputs)} renditions ({', '.join(f'{h}p' for h, _ in outputs)}) from one decode")
+    print(f"🎛️ Profile: {describe_profile(profile)}")
+
+    start = time.time()
+    result = run_ffmpeg(build_ladder_command(input_file, outputs, profile), timeout=timeout, on_progress=on_progress)
+    elapsed = time.time() - start
+
+    status = {}
+    for height, output_file in outputs:
+        ok = result.returncode == 0 and os.path.exists(output_file) and os.path.getsize(output_file) > 0
+        status[height] = ok
+        if ok:
+            print(f"✅ {height}p: {os.path.getsize(output_file) / (1024 * 1024):.1f} MB")
+    if result.returncode == 0:
+        print(f"✅ Ladder encoded in {elapsed:.1f}s")
+    else:
+        print(f"❌ Ladder encode failed")
+        if result.stderr:
+            print(f"Error: {result.stderr[-500:]}")
+    return status
+
+
+# ===== AUTOTUNE =====
+
+def cut_sample(input_file, sample_file, start, seconds):
+    """Cut a sample clip with stream copy"""
+    cmd = [
+        'ffmpeg',
+        '-ss', str(start),
+        '-i', input_file,
+        '-t', str(seconds),
+        '-c', 'copy',
+        '-y',
+        sample_file
+    ]
+    result = subprocess.run(cmd, capture_output=True, text=True, timeout=120)
+    return result.returncode == 0 and os.path.exists(sample_file) and os.path.getsize(sample_file) > 0
+
+
+def probe_duration(input_file):
+    """Get duration in seconds as float"""
+    try:
+        cmd = ['ffprobe', '-v', 'error', '-show_entries', 'format=duration',
+               '-of', 'default=noprint_wrappers=1:nokey=1', input_file]
+        result = subprocess.run(cmd, capture_output=True, text=True)
+        if result.returncode == 0:
+            return float(result.stdout.strip())
+    except:
+        pass
+    return 0.0
+
+
+def count_video_frames(input_file):
+    """Count video packets in a file (cheap frame count)"""
+    try:
+        cmd = ['ffprobe', '-v', 'error', '-select_streams', 'v:0', '-count_packets',
+               '-show_entries', 'stream=nb_read_packets', '-of', 'csv=p=0', input_file]
+        result = subprocess.run(cmd, capture_output=True, text=True)
+        if result.returncode == 0:
+            return int(result.stdout.strip().split(',')[0])
+    except:
+        pass
+    return 0
+
+
+def benchmark_profile(sample_file, output_file, profile, sample_duration):
+    """Encode the sample with a profile and measure fps and size"""
+    cmd = ['ffmpeg', '-i', sample_file, '-vf', 'scale=-2:240']
+    cmd += build_encode_args(profile)
+    cmd += ['-y', output_file]
+
+    start = time.time()
+    result = subprocess.run(cmd, capture_output=True, text=True, timeout=600)
+    elapsed = time.time() - start
+
+    if result.returncode != 0 or not os.path.exists(output_file):
+        return None
+
+    size_mb = os.path.getsize(output_file) / (1024 * 1024)
+    frames = count_video_frames(output_file)
+    return {
+        "elapsed": round(elapsed, 2),
+        "fps": round(frames / elapsed, 1) if elapsed > 0 else 0,
+        "speed": round(sample_duration / elapsed, 2) if elapsed > 0 else 0,
+        "size_mb": round(size_mb, 3),
+        "mb_per_min": round(size_mb / (sample_duration / 60), 3) if sample_duration > 0 else 0,
+    }
+
+
+def autotune(input_file, target_mb_per_min=AUTOTUNE_TARGET_MB_PER_MIN, sample_seconds=30,
+             start=60, presets=None, tunes=None, thread_counts=None, crf=AUTOTUNE_CRF):
+    """Benchmark profile candidates on a sample clip and save the fastest one under target"""
+    presets = presets or AUTOTUNE_PRESETS
+    tunes = tunes if tunes is not None else AUTOTUNE_TUNES
+    if thread_counts is None:
+        cpus = os.cpu_count() or 2
+        thread_counts = sorted({0, cpus})
+
+    print("="*50)
+    print("⚙️ Encoding Profile Autotune")
+    print("="*50)
+    print(f"🎞️ Source: {input_file}")
+    print(f"🎯 Target: ≤ {target_mb_per_min:.2f} MB/min")
+
+    work_dir = tempfile.mkdtemp(prefix="autotune_")
+    try:
+        sample_file = os.path.join(work_dir, "sample.mp4")
+        print(f"✂️ Cutting {sample_seconds}s sample at {start}s...")
+        if not cut_sample(input_file, sample_file, start, sample_seconds):
+            print("⚠️ Sample cut failed at offset, retrying from start...")
+            if not cut_sample(input_file, sample_file, 0, sample_seconds):
+                print("❌ Cannot cut sample clip")
+                return None
+
+        sample_duration = probe_duration(sample_file) or float(sample_seconds)
+
+        results = []
+        for preset, tune, threads in itertools.product(presets, tunes, thread_counts):
+            profile = {
+                "name": f"{preset}-crf{crf}" + (f"-{tune}" if tune else "") + (f"-t{threads}" if threads else ""),
+                "preset": preset,
+                "crf": crf,
+                "tune": tune,
+                "threads": threads,
+                "audio_bitrate": "64k",
+            }
+            output_file = os.path.join(work_dir, f"{profile['name']}.mp4")
+            stats = benchmark_profile(sample_file, output_file, profile, sample_duration)
+            if not stats:
+                print(f"  ❌ {profile['name']}: encode failed")
+                continue
+            print(f"  • {profile['name']}: {stats['fps']} fps, {stats['speed']}x, {stats['mb_per_min']} MB/min")
+            results.append((profile, stats))
+            try:
+                os.remove(output_file)
+            except:
+                pass
+
+        if not results:
+            print("❌ No profile could be benchmarked")
+            return None
+
+        within_target = [r for r in results if r[1]["mb_per_min"] <= target_mb_per_min]
+        if within_target:
+            best_profile, best_stats = max(within_target, key=lambda r: r[1]["fps"])
+            print(f"✅ Fastest within target: {best_profile['name']}")
+        else:
+            best_profile, best_stats = min(results, key=lambda r: r[1]["mb_per_min"])
+            print(f"⚠️ No profile meets target, using smallest: {best_profile['name']}")
+
+        saved = dict(best_profile)
+        saved["benchmark"] = best_stats
+        saved["target_mb_per_min"] = target_mb_per_min
+        saved["cpu_count"] = os.cpu_count()
+        saved["created"] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
+        with open(PROFILE_FILE, 'w', encoding='utf-8') as f:
+            json.dump(saved, f, ensure_ascii=False, indent=2)
+        print(f"💾 Saved profile to {PROFILE_FILE}")
+        return saved
+
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="x264 encoding profiles")
+    sub = parser.add_subparsers(dest="command")
+
+    sub.add_parser("list", help="List registered profiles")
+    sub.add_parser("show", help="Show the active profile")
+
+    tune_parser = sub.add_parser("autotune", help="Benchmark profiles on a sample clip")
+    tune_parser.add_argument("input_file")
+    tune_parser.add_argument("--target-mb-per-min", type=float, default=AUTOTUNE_TARGET_MB_PER_MIN)
+    tune_parser.add_argument("--sample-seconds", type=int, default=30)
+    tune_parser.add_argument("--start", type=int, default=60)
+    tune_parser.add_argument("--presets", default=",".join(AUTOTUNE_PRESETS))
+    tune_parser.add_argument("--tunes", default="none,fastdecode,zerolatency")
+    tune_parser.add_argument("--threads", default=None, help="Comma-separated thread counts (0 = auto)")
+    tune_parser.add_argument("--crf", type=int, default=AUTOTUNE_CRF)
+
+    args = parser.parse_args()
+
+    if args.command == "list":
+        for name in PROFILES:
+            print(f"• {describe_profile(get_profile(name))}")
+    elif args.command == "show":
+        print(f"🎛️ Active profile: {describe_profile(load_profile())}")
+    elif args.command == "autotune":
+        if not os.path.exists(args.input_file):
+            print(f"❌ File not found: {args.input_file}")
+            sys.exit(1)
+        tunes = [None if t in ("", "none") else t for t in args.tunes.split(",")]
+        thread_counts = [int(t) for t in args.threads.split(",")] if args.threads else None
+        if not autotune(args.input_file, args.target_mb_per_min, args.sample_seconds, args.start,
+                        args.presets.split(","), tunes, thread_counts, args.crf):
+            sys.exit(1)
+    else:
+        parser.print_help()
+
+
+if __name__ == "__main__":
+    main()
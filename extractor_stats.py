@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Extractor Stats - per-host and per-series success rates and latencies
+Used by main.py to try the cheapest, most successful extractor first
+"""
+
+import os
+import json
+import threading
+
+STATS_FILE = os.environ.get("EXTRACTOR_STATS_FILE", "extractor_stats.json")
+
+# Scope needs this many attempts before its numbers are trusted over a wider scope
+MIN_ATTEMPTS = 3
+
+
+class ExtractorStats:
+    """Success/latency bookkeeping persisted to a local JSON file"""
+
+    def __init__(self, path=STATS_FILE):
+        self.path = path
+        self.lock = threading.Lock()
+        self.data = {}
+        self.load()
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.data = json.load(f)
+        except Exception as e:
+            print(f"⚠️ Cannot read {self.path}: {e}")
+            self.data = {}
+
+    def save(self):
+        with self.lock:
+            try:
+                tmp_path = self.path + ".tmp"
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump(self.data, f, ensure_ascii=False, indent=2)
+                os.replace(tmp_path, self.path)
+            except Exception as e:
+                print(f"⚠️ Cannot save {self.path}: {e}")
+
+    def record(self, scopes, name, success, latency):
+        """Record one attempt of an extractor under each scope (e.g. 'series:x', 'host:y')"""
+        with self.lock:
+            for scope in scopes:
+                entry = self.data.setdefault(scope, {}).setdefault(
+                    name, {'attempts': 0, 'successes': 0, 'latency': 0.0})
+                entry['attempts'] += 1
+                if success:
+                    entry['successes'] += 1
+                entry['latency'] += latency
+
+    def lookup(self, scopes, name):
+        """First scope with enough attempts wins, narrowest scope first"""
+        for scope in scopes:
+            entry = self.data.get(scope, {}).get(name)
+            if entry and entry['attempts'] >= MIN_ATTEMPTS:
+                return entry
+        return None
+
+    def expected_cost(self, scopes, name, prior_cost):
+        """Expected seconds per success: average latency / smoothed success rate"""
+        entry = self.lookup(scopes, name)
+        if not entry:
+            # Unknown: assume a coin flip at the extractor's nominal cost
+            return prior_cost / 0.5
+        success_rate = (entry['successes'] + 1) / (entry['attempts'] + 2)
+        avg_latency = entry['latency'] / entry['attempts']
+        return max(avg_latency, 0.1) / success_rate
+
+    def order(self, scopes, extractors):
+        """Sort extractor dicts ({'name', 'cost', ...}) cheapest expected first"""
+        return sorted(extractors, key=lambda e: self.expected_cost(scopes, e['name'], e['cost']))
+
+    def describe(self, scopes, name):
+        entry = self.lookup(scopes, name)
+        if not entry:
+            return "no data"
+        return (f"{entry['successes']}/{entry['attempts']} ok, "
+                f"{entry['latency'] / entry['attempts']:.1f}s avg")
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+ffmpeg runner with machine-readable progress (-progress pipe:1)
+Progress blocks are parsed incrementally and passed to a callback, a
+watchdog kills encodes that stall (no new frames), and stderr is kept in a
+bounded ring buffer instead of being buffered whole in memory
+"""
+
+import os
+import time
+import threading
+import subprocess
+from collections import deque
+
+# Kill ffmpeg when the frame counter hasn't moved for this long
+STALL_SECONDS = int(os.environ.get("FFMPEG_STALL_SECONDS", "120"))
+# Last stderr lines kept for error reporting
+STDERR_RING_LINES = 50
+
+
+def with_progress_args(cmd):
+    """Insert -progress pipe:1 -nostats right after the ffmpeg binary"""
+    return [cmd[0], '-progress', 'pipe:1', '-nostats'] + list(cmd[1:])
+
+
+def run_ffmpeg(cmd, timeout=3600, on_progress=None, stall_seconds=STALL_SECONDS):
+    """Run ffmpeg, streaming progress; returns a CompletedProcess with the stderr tail
+
+    timeout=None waits for ffmpeg to finish however long it takes.
+    The result has .stalled / .timed_out set when the watchdog killed ffmpeg.
+    """
+    full_cmd = with_progress_args(cmd)
+    start = time.time()
+
+    process = subprocess.Popen(full_cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                               stdin=subprocess.DEVNULL, text=True, bufsize=1,
+                               errors='replace')
+
+    stderr_ring = deque(maxlen=STDERR_RING_LINES)
+    state = {'frame': -1, 'last_advance': time.time(), 'stalled': False, 'timed_out': False}
+    finished = threading.Event()
+
+    def read_stderr():
+        for line in process.stderr:
+            stderr_ring.append(line.rstrip('\n'))
+
+    def watchdog():
+        while not finished.wait(5):
+            now = time.time()
+            if timeout and now - start > timeout:
+                state['timed_out'] = True
+                print(f"⏰ ffmpeg timed out after {timeout}s, killing")
+                process.kill()
+                return
+            if stall_seconds and now - state['last_advance'] > stall_seconds:
+                state['stalled'] = True
+                print(f"🧊 ffmpeg stalled (no new frames for {stall_seconds}s), killing")
+                process.kill()
+                return
+
+    stderr_thread = threading.Thread(target=read_stderr, daemon=True)
+    watchdog_thread = threading.Thread(target=watchdog, daemon=True)
+    stderr_thread.start()
+    watchdog_thread.start()
+
+    block = {}
+    try:
+        for line in process.stdout:
+            key, _, value = line.strip().partition('=')
+            if not key:
+                continue
+            block[key] = value
+            if key != 'progress':
+                continue
+
+            # One complete progress block
+            try:
+                frame = int(block.get('frame', 0) or 0)
+            except ValueError:
+                frame = 0
+            # Audio-only outputs report no frames - use out_time instead
+            marker = frame or block.get('out_time_us') or block.get('out_time_ms')
+            if marker != state['frame']:
+                state['frame'] = marker
+                state['last_advance'] = time.time()
+
+            if on_progress:
+                try:
+                    on_progress(block)
+                except Exception:
+                    pass
+            block = {}
+        process.wait()
+    finally:
+        finished.set()
+        if process.poll() is None:
+            process.kill()
+            process.wait()
+        stderr_thread.join(timeout=5)
+
+    result = subprocess.CompletedProcess(full_cmd, process.returncode, '', "\n".join(stderr_ring))
+    result.stalled = state['stalled']
+    result.timed_out = state['timed_out']
+    if result.returncode == 0 and (result.stalled or result.timed_out):
+        result.returncode = -9
+    return result
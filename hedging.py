@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Hedged requests across mirror domains
+Send to the fastest-known mirror first, fire a backup to the next mirror if
+there is no answer within a latency percentile, take whichever answers first
+"""
+
+import time
+import threading
+import contextvars
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from urllib.parse import urlparse
+
+HEDGE_PERCENTILE = 0.9
+DEFAULT_HEDGE_DELAY = 3.0  # seconds, until a mirror has latency samples
+MIN_HEDGE_DELAY = 0.5
+MAX_SAMPLES = 50
+
+hedge_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="hedge")
+
+
+class MirrorLatency:
+    """Recent response latencies per mirror domain"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.samples = {}
+        self.failures = {}
+
+    def record(self, url, latency, success=True):
+        domain = urlparse(url).netloc
+        with self.lock:
+            if success:
+                self.samples.setdefault(domain, deque(maxlen=MAX_SAMPLES)).append(latency)
+            else:
+                self.failures[domain] = self.failures.get(domain, 0) + 1
+
+    def percentile(self, url, p):
+        domain = urlparse(url).netloc
+        with self.lock:
+            samples = sorted(self.samples.get(domain, []))
+        if not samples:
+            return None
+        return samples[min(len(samples) - 1, int(p * len(samples)))]
+
+    def order(self, urls):
+        """Fastest median latency first; unknown mirrors keep their given order"""
+        def key(item):
+            position, url = item
+            median = self.percentile(url, 0.5)
+            failures = self.failures.get(urlparse(url).netloc, 0)
+            return (median is None, (median or 0) + failures, position)
+        return [url for _, url in sorted(enumerate(urls), key=key)]
+
+    def describe(self):
+        with self.lock:
+            domains = sorted(set(self.samples) | set(self.failures))
+        lines = []
+        for domain in domains:
+            median = self.percentile(f"https://{domain}/", 0.5)
+            median_text = f"{median:.2f}s" if median is not None else "n/a"
+            lines.append(f"{domain}: p50={median_text}, failures={self.failures.get(domain, 0)}")
+        return lines
+
+
+def hedged_get(urls, fetch, latency, percentile=HEDGE_PERCENTILE, accept=None):
+    """Fetch the same resource from several mirrors with hedging
+
+    fetch(url) returns a response, None (mirror skipped) or raises. Only a
+    200 can win; anything else moves on to the next mirror. accept(url,
+    response) can turn a 200 into the caller's result, or reject it with
+    None (e.g. a page without a video). Returns (url, result) - result is
+    the response when there is no accept - or (None, None).
+    """
+    ordered = latency.order(urls)
+    pending = {}
+
+    def timed_fetch(url):
+        start = time.time()
+        try:
+            response = fetch(url)
+        except Exception:
+            latency.record(url, time.time() - start, success=False)
+            raise
+        if response is None:
+            return None
+        # Any answer below 500 is a live mirror for latency purposes, even if it can't win
+        latency.record(url, time.time() - start, success=response.status_code < 500)
+        if response.status_code != 200:
+            print(f"❌ {urlparse(url).netloc}: HTTP {response.status_code}")
+            return None
+        # Runs in the worker thread, so parsing overlaps with the other mirrors
+        return accept(url, response) if accept else response
+
+    def launch_next():
+        if not ordered:
+            return None
+        url = ordered.pop(0)
+        # Run in a copy of the caller's context (per-item request counting)
+        pending[hedge_executor.submit(contextvars.copy_context().run, timed_fetch, url)] = url
+        return url
+
+    launch_next()
+    while pending:
+        # Hedge delay comes from the slowest in-flight mirror's latency percentile
+        delays = [latency.percentile(url, percentile) for url in pending.values()]
+        delay = max([d for d in delays if d is not None] or [DEFAULT_HEDGE_DELAY])
+        delay = max(delay, MIN_HEDGE_DELAY)
+
+        done, _ = wait(list(pending), timeout=delay if ordered else None, return_when=FIRST_COMPLETED)
+
+        if not done:
+            backup = launch_next()
+            if backup:
+                print(f"🪁 No answer in {delay:.1f}s, hedging with {urlparse(backup).netloc}")
+            continue
+
+        for future in done:
+            url = pending.pop(future)
+            try:
+                result = future.result()
+            except Exception as e:
+                print(f"❌ {urlparse(url).netloc}: {str(e)[:50]}")
+                result = None
+            if result is not None:
+                return url, result
+
+        # Every finished request failed or was rejected - move on to the next mirror right away
+        if not pending:
+            launch_next()
+
+    return None, None
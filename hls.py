@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+HLS playlist parser - master and media playlists
+Resolves URIs with urljoin (keeps query tokens intact) and estimates
+total duration / segment count from EXTINF without fetching segments
+"""
+
+import re
+import time
+import requests
+from urllib.parse import urljoin
+
+ATTRIBUTE_RE = re.compile(r'([A-Z0-9-]+)=("[^"]*"|[^,]*)')
+
+
+def parse_attributes(text):
+    """Parse an attribute list: KEY=value,KEY="quoted, value",..."""
+    attributes = {}
+    for key, value in ATTRIBUTE_RE.findall(text):
+        if value.startswith('"') and value.endswith('"'):
+            value = value[1:-1]
+        attributes[key] = value
+    return attributes
+
+
+def parse_byterange(text, previous_end=0):
+    """Parse EXT-X-BYTERANGE / BYTERANGE value 'length[@offset]' -> (length, offset)"""
+    if '@' in text:
+        length, offset = text.split('@', 1)
+        return int(length), int(offset)
+    return int(text), previous_end
+
+
+def is_master_playlist(text):
+    """Master playlists list variants, media playlists list segments"""
+    return '#EXT-X-STREAM-INF' in text
+
+
+def parse_master(text, base_url):
+    """Parse a master playlist into a list of variant dicts"""
+    variants = []
+    media = []
+    pending = None
+
+    for raw_line in text.splitlines():
+        line = raw_line.strip()
+        if not line:
+            continue
+
+        if line.startswith('#EXT-X-STREAM-INF:'):
+            attrs = parse_attributes(line.split(':', 1)[1])
+            width, height = 0, 0
+            res_match = re.match(r'(\d+)x(\d+)', attrs.get('RESOLUTION', ''))
+            if res_match:
+                width, height = int(res_match.group(1)), int(res_match.group(2))
+            pending = {
+                'height': height,
+                'width': width,
+                'bandwidth': int(attrs.get('BANDWIDTH', 0) or 0),
+                'average_bandwidth': int(attrs.get('AVERAGE-BANDWIDTH', 0) or 0),
+                'codecs': attrs.get('CODECS', ''),
+                'frame_rate': float(attrs.get('FRAME-RATE', 0) or 0),
+                'audio': attrs.get('AUDIO'),
+                'url': None,
+            }
+
+        elif line.startswith('#EXT-X-MEDIA:'):
+            attrs = parse_attributes(line.split(':', 1)[1])
+            if attrs.get('URI'):
+                attrs['URI'] = urljoin(base_url, attrs['URI'])
+            media.append(attrs)
+
+        elif not line.startswith('#') and pending is not None:
+            pending['url'] = urljoin(base_url, line)
+            variants.append(pending)
+            pending = None
+
+    # Attach alternate audio renditions to their variants
+    for variant in variants:
+        variant['audio_url'] = None
+        if variant['audio']:
+            for rendition in media:
+                if rendition.get('TYPE') == 'AUDIO' and rendition.get('GROUP-ID') == variant['audio'] and rendition.get('URI'):
+                    variant['audio_url'] = rendition['URI']
+                    if rendition.get('DEFAULT') == 'YES':
+                        break
+
+    return variants
+
+
+def parse_media(text, base_url):
+    """Parse a media playlist into segments plus summary info"""
+    playlist = {
+        'target_duration': 0,
+        'media_sequence': 0,
+        'endlist': False,
+        'map': None,
+        'keys': [],
+        'segments': [],
+    }
+
+    duration = None
+    byterange = None
+    key = None
+    map_info = None
+    previous_end = 0
+
+    for raw_line in text.splitlines():
+        line = raw_line.strip()
+        if not line:
+            continue
+
+        if line.startswith('#EXTINF:'):
+            value = line.split(':', 1)[1].split(',', 1)[0]
+            try:
+                duration = float(value)
+            except ValueError:
+                duration = 0.0
+
+        elif line.startswith('#EXT-X-BYTERANGE:'):
+            byterange = parse_byterange(line.split(':', 1)[1], previous_end)
+
+        elif line.startswith('#EXT-X-KEY:'):
+            attrs = parse_attributes(line.split(':', 1)[1])
+            if attrs.get('METHOD', 'NONE') == 'NONE':
+                key = None
+            else:
+                key = {
+                    'method': attrs.get('METHOD'),
+                    'uri': urljoin(base_url, attrs['URI']) if attrs.get('URI') else None,
+                    'iv': attrs.get('IV'),
+                }
+                playlist['keys'].append(key)
+
+        elif line.startswith('#EXT-X-MAP:'):
+            attrs = parse_attributes(line.split(':', 1)[1])
+            map_info = {'uri': urljoin(base_url, attrs.get('URI', '')), 'byterange': None}
+            if attrs.get('BYTERANGE'):
+                map_info['byterange'] = parse_byterange(attrs['BYTERANGE'])
+            playlist['map'] = map_info
+
+        elif line.startswith('#EXT-X-TARGETDURATION:'):
+            playlist['target_duration'] = int(float(line.split(':', 1)[1]))
+
+        elif line.startswith('#EXT-X-MEDIA-SEQUENCE:'):
+            playlist['media_sequence'] = int(line.split(':', 1)[1])
+
+        elif line.startswith('#EXT-X-ENDLIST'):
+            playlist['endlist'] = True
+
+        elif not line.startswith('#'):
+            segment = {
+                'url': urljoin(base_url, line),
+                'duration': duration or 0.0,
+                'byterange': byterange,
+                'key': key,
+                'map': map_info,
+            }
+            playlist['segments'].append(segment)
+            if byterange:
+                previous_end = byterange[0] + byterange[1]
+            duration = None
+            byterange = None
+
+    playlist['segment_count'] = len(playlist['segments'])
+    playlist['total_duration'] = sum(s['duration'] for s in playlist['segments'])
+    playlist['encrypted'] = bool(playlist['keys'])
+    return playlist
+
+
+def parse_playlist(text, base_url):
+    """Parse either playlist type -> {'type': 'master'|'media', ...}"""
+    if is_master_playlist(text):
+        return {'type': 'master', 'variants': parse_master(text, base_url)}
+    playlist = parse_media(text, base_url)
+    playlist['type'] = 'media'
+    return playlist
+
+
+def fetch_playlist(url, headers=None, timeout=30, session=None, limiter=None):
+    """Fetch and parse a playlist; returns (parsed, bytes, seconds) or (None, 0, 0)
+
+    limiter: optional HostLimiter the request goes through.
+    """
+    getter = session.get if session else requests.get
+    start = time.time()
+    if limiter:
+        response = limiter.get(getter, url, headers=headers, timeout=timeout)
+    else:
+        response = getter(url, headers=headers, timeout=timeout)
+    elapsed = time.time() - start
+
+    if response.status_code != 200 or '#EXTM3U' not in response.text[:1024]:
+        return None, len(response.content), elapsed
+
+    # Resolve relative URIs against the final URL (after redirects)
+    return parse_playlist(response.text, response.url or url), len(response.content), elapsed
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Per-host AIMD concurrency limiter
+Each host gets a concurrency window: +1 per window's worth of fast,
+successful responses (additive increase), halved on 429 / 503 / Cloudflare
+challenges / timeouts (multiplicative decrease). Callers block while the
+host's window is full. The window only grows while it is actually used
+(some request was admitted with the window full), so a run of serial
+requests can't inflate it before a burst.
+"""
+
+import os
+import time
+import threading
+from contextlib import contextmanager
+from urllib.parse import urlparse
+
+INITIAL_LIMIT = float(os.environ.get("AIMD_INITIAL", "2"))
+MIN_LIMIT = 1.0
+MAX_LIMIT = float(os.environ.get("AIMD_MAX", "8"))
+DECREASE_FACTOR = 0.5
+# A response slower than this multiple of the host's typical latency doesn't grow the window
+SLOW_FACTOR = 2.0
+LATENCY_ALPHA = 0.2
+
+THROTTLE_STATUSES = (429, 503)
+CHALLENGE_MARKERS = ("Just a moment", "cf-chl", "challenge-platform", "Attention Required")
+
+
+def host_of(url):
+    return urlparse(url).netloc.lower()
+
+
+def is_challenge(response):
+    """Cloudflare (or similar) interstitial instead of the real page"""
+    if response.status_code not in (403, 503):
+        return False
+    if response.headers.get("cf-mitigated") == "challenge":
+        return True
+    try:
+        head = response.text[:4096]
+    except Exception:
+        return False
+    return any(marker in head for marker in CHALLENGE_MARKERS)
+
+
+def is_throttled(response):
+    return response.status_code in THROTTLE_STATUSES or is_challenge(response)
+
+
+def is_throttle_error(error):
+    """yt-dlp / requests errors that mean the host is pushing back"""
+    text = str(error)
+    return any(marker in text for marker in ("429", "Too Many Requests", "503", "Service Unavailable"))
+
+
+class HostState:
+    def __init__(self):
+        self.limit = INITIAL_LIMIT
+        self.in_flight = 0
+        # Most requests in flight at admission since the window last changed size
+        self.used = 0
+        self.latency = None
+        self.last_decrease = 0.0
+        self.throttles = 0
+        self.requests = 0
+        self.peak = INITIAL_LIMIT
+
+
+class HostLimiter:
+    """AIMD concurrency window per host"""
+
+    def __init__(self):
+        self.hosts = {}
+        self.condition = threading.Condition()
+
+    def _state(self, host):
+        state = self.hosts.get(host)
+        if state is None:
+            state = self.hosts[host] = HostState()
+        return state
+
+    def limit(self, url):
+        """Current window for a host (e.g. yt-dlp concurrent_fragment_downloads)"""
+        with self.condition:
+            return max(1, int(self._state(host_of(url)).limit))
+
+    def acquire(self, url):
+        host = host_of(url)
+        with self.condition:
+            state = self._state(host)
+            while state.in_flight >= max(1, int(state.limit)):
+                self.condition.wait()
+            state.in_flight += 1
+            state.requests += 1
+            state.used = max(state.used, state.in_flight)
+
+    def release(self, url):
+        with self.condition:
+            state = self._state(host_of(url))
+            state.in_flight = max(0, state.in_flight - 1)
+            self.condition.notify_all()
+
+    def record_success(self, url, latency=None):
+        """Additive increase: about +1 per window of fast successful responses"""
+        with self.condition:
+            state = self._state(host_of(url))
+            if latency is not None:
+                slow = state.latency is not None and latency > state.latency * SLOW_FACTOR
+                state.latency = latency if state.latency is None else (
+                    state.latency + LATENCY_ALPHA * (latency - state.latency))
+                if slow:
+                    return
+            if state.used < int(state.limit):
+                return  # window not the bottleneck - growing it would only allow a bigger burst later
+            old = int(state.limit)
+            state.limit = min(MAX_LIMIT, state.limit + 1.0 / state.limit)
+            if int(state.limit) != old:
+                state.used = state.in_flight
+            state.peak = max(state.peak, state.limit)
+            self.condition.notify_all()
+
+    def record_throttle(self, url, reason=""):
+        """Multiplicative decrease, at most once per round trip (one burst = one backoff)"""
+        with self.condition:
+            host = host_of(url)
+            state = self._state(host)
+            state.throttles += 1
+            now = time.time()
+            if now - state.last_decrease < max(state.latency or 0, 1.0):
+                return
+            state.last_decrease = now
+            old = state.limit
+            state.limit = max(MIN_LIMIT, state.limit * DECREASE_FACTOR)
+            state.used = state.in_flight
+            print(f"🐢 {host}: {reason or 'throttled'}, concurrency {old:.1f} → {state.limit:.1f}")
+
+    def record(self, url, response, latency):
+        if is_throttled(response):
+            reason = "challenge page" if is_challenge(response) else f"HTTP {response.status_code}"
+            self.record_throttle(url, reason)
+        elif response.status_code < 400:
+            self.record_success(url, latency)
+
+    @contextmanager
+    def slot(self, url):
+        """Hold one of the host's slots; timeouts/connection errors count as throttling"""
+        self.acquire(url)
+        try:
+            yield
+        except Exception as e:
+            if "timeout" in type(e).__name__.lower() or "connection" in type(e).__name__.lower():
+                self.record_throttle(url, type(e).__name__)
+            raise
+        finally:
+            self.release(url)
+
+    def get(self, getter, url, **kwargs):
+        """getter(url, **kwargs) inside a slot, feeding the response back into the window
+
+        The slot is released once the response is back - for streamed bodies
+        hold slot() around the whole transfer instead.
+        """
+        with self.slot(url):
+            start = time.time()
+            response = getter(url, **kwargs)
+            self.record(url, response, time.time() - start)
+            return response
+
+    def describe(self):
+        with self.condition:
+            return [f"{host}: window={state.limit:.1f} (peak {state.peak:.1f}), "
+                    f"requests={state.requests}, throttled={state.throttles}"
+                    for host, state in sorted(self.hosts.items())]
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Targeted HTML scanning - find the first matching tag without building a DOM
+The page is fed to html.parser in chunks and parsing stops at the first
+match, so nothing after it is tokenised and no tree is kept in memory.
+Script/style contents are skipped as raw text, like a browser does.
+"""
+
+from html.parser import HTMLParser
+
+CHUNK_SIZE = 64 * 1024
+
+
+class _Found(Exception):
+    pass
+
+
+class FirstTagScanner(HTMLParser):
+    """Stops at the first <tag> that has `attr` set"""
+
+    def __init__(self, tag, attr):
+        super().__init__(convert_charrefs=True)
+        self.tag = tag
+        self.attr = attr
+        self.value = None
+
+    def handle_starttag(self, tag, attrs):
+        if tag != self.tag:
+            return
+        for name, value in attrs:
+            if name == self.attr and value:
+                self.value = value
+                raise _Found()
+
+    handle_startendtag = handle_starttag
+
+
+def find_first_attr(html, tag, attr, chunk_size=CHUNK_SIZE):
+    """Value of `attr` on the first <tag> carrying it, or None"""
+    scanner = FirstTagScanner(tag.lower(), attr.lower())
+    try:
+        for start in range(0, len(html), chunk_size):
+            scanner.feed(html[start:start + chunk_size])
+        scanner.close()
+    except _Found:
+        pass
+    except Exception:
+        # Malformed markup: whatever was found before the error still counts
+        pass
+    return scanner.value
+
+
+def find_first_iframe(html):
+    """src of the first iframe, with protocol-relative URLs made absolute"""
+    src = find_first_attr(html, 'iframe', 'src')
+    if src and src.startswith('//'):
+        src = 'https:' + src
+    return src
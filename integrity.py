@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+Download integrity gate - reject truncated/corrupt downloads in milliseconds,
+before they reach the encoder or the uploader
+- SHA-256 computed while downloading (or in one read right after)
+- MP4: walk the top-level boxes (no box may run past EOF, moov + media
+  data present) and read the duration from mvhd
+- text bodies (playlist, HTML error page, JSON) are rejected outright; other
+  containers need a duration from one ffprobe call
+- duration vs bytes: implied bitrate must be plausible and the duration must
+  match the playlist estimate when there is one
+"""
+
+import os
+import struct
+import hashlib
+import threading
+
+from workfiles import remove_file
+from encoding_profiles import probe_duration
+
+HASH_CHUNK = 1024 * 1024
+MIN_FILE_BYTES = 1024
+MAX_TOP_LEVEL_BOXES = 10000
+
+# Plausible average bitrates for anything we download (bits/s)
+MIN_BITRATE = 16 * 1000
+MAX_BITRATE = 100 * 1000 * 1000
+# Accept this much shortfall against the playlist's total duration
+DURATION_TOLERANCE = 0.1
+# Extra downloads when the gate rejects a file
+INTEGRITY_RETRIES = int(os.environ.get("INTEGRITY_RETRIES", "1"))
+
+# First bytes of text bodies that a server sends instead of media (playlist, HTML error page, JSON)
+TEXT_MARKERS = (b'#EXTM3U', b'<', b'{')
+
+KNOWN_BOXES = {b'ftyp', b'moov', b'mdat', b'free', b'skip', b'wide', b'uuid', b'moof', b'mfra',
+               b'sidx', b'styp', b'pdin', b'meta', b'emsg', b'prft', b'ssix', b'udta'}
+
+digests = {}
+digests_lock = threading.Lock()
+
+
+# ===== HASHING =====
+
+def remember_digest(path, hasher):
+    """Store the hash computed while downloading path"""
+    stat = os.stat(path)
+    with digests_lock:
+        digests[path] = (stat.st_size, stat.st_mtime, hasher.hexdigest())
+
+
+def file_sha256(path):
+    """SHA-256 of a file (reuses the digest computed during the download if the file is unchanged)"""
+    stat = os.stat(path)
+    with digests_lock:
+        cached = digests.get(path)
+    if cached and cached[:2] == (stat.st_size, stat.st_mtime):
+        return cached[2]
+
+    hasher = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK), b''):
+            hasher.update(chunk)
+    remember_digest(path, hasher)
+    return hasher.hexdigest()
+
+
+# ===== CONTAINER CHECKS =====
+
+def read_box_header(f, offset, file_size):
+    """(type, size, header_len) of the box at offset, or None if the header is cut off"""
+    f.seek(offset)
+    header = f.read(8)
+    if len(header) < 8:
+        return None
+    size, box_type = struct.unpack('>I4s', header)
+    header_len = 8
+    if size == 1:
+        extended = f.read(8)
+        if len(extended) < 8:
+            return None
+        size = struct.unpack('>Q', extended)[0]
+        header_len = 16
+    elif size == 0:
+        size = file_size - offset  # box runs to EOF
+    return box_type, size, header_len
+
+
+def read_mvhd_duration(f, moov_offset, moov_size, moov_header):
+    """Movie duration in seconds from moov/mvhd (None if absent or zero)"""
+    offset = moov_offset + moov_header
+    end = moov_offset + moov_size
+    while offset + 8 <= end:
+        header = read_box_header(f, offset, end)
+        if header is None:
+            return None
+        box_type, size, header_len = header
+        if size < header_len:
+            return None
+        if box_type == b'mvhd':
+            f.seek(offset + header_len)
+            version = f.read(4)[:1]
+            if version == b'\x01':
+                data = f.read(28)
+                if len(data) < 28:
+                    return None
+                timescale, duration = struct.unpack('>16xIQ', data)
+            else:
+                data = f.read(16)
+                if len(data) < 16:
+                    return None
+                timescale, duration = struct.unpack('>8xII', data)
+            return duration / timescale if timescale and duration else None
+        offset += size
+    return None
+
+
+def scan_mp4(path, file_size):
+    """Top-level box walk; returns (ok, reason, duration)"""
+    boxes = {}
+    duration = None
+    offset = 0
+    with open(path, 'rb') as f:
+        while offset < file_size:
+            header = read_box_header(f, offset, file_size)
+            if header is None:
+                return False, f"truncated box header at byte {offset}", None
+            box_type, size, header_len = header
+            if size < header_len:
+                return False, f"invalid {box_type!r} box size {size} at byte {offset}", None
+            if box_type not in KNOWN_BOXES and not box_type.isalnum():
+                return False, f"garbage at byte {offset} (box type {box_type!r})", None
+            if offset + size > file_size:
+                missing = offset + size - file_size
+                return False, f"truncated: {box_type.decode('latin-1')} box needs {missing} more bytes", None
+
+            boxes[box_type] = boxes.get(box_type, 0) + 1
+            if box_type == b'moov':
+                duration = read_mvhd_duration(f, offset, size, header_len)
+
+            offset += size
+            if sum(boxes.values()) > MAX_TOP_LEVEL_BOXES:
+                break
+
+    if b'moov' not in boxes:
+        return False, "no moov box (index missing - download cut short?)", None
+    if b'mdat' not in boxes and b'moof' not in boxes:
+        return False, "no media data (mdat/moof)", None
+    return True, "mp4 boxes ok", duration
+
+
+def scan_mpegts(path, file_size):
+    """Sync bytes at the start, middle and end of an MPEG-TS file"""
+    packet = 188
+    with open(path, 'rb') as f:
+        last_full = (file_size // packet - 1) * packet
+        for offset in sorted({0, packet, (file_size // 2 // packet) * packet, last_full}):
+            f.seek(offset)
+            if f.read(1) != b'\x47':
+                return False, f"lost MPEG-TS sync at byte {offset}"
+    if file_size % packet:
+        # A cut-off last packet is dropped by demuxers - not worth a re-download
+        return True, f"mpeg-ts ok (last {file_size % packet} bytes partial)"
+    return True, "mpeg-ts ok"
+
+
+def detect_container(path):
+    with open(path, 'rb') as f:
+        head = f.read(64)
+    if head.lstrip(b'\xef\xbb\xbf \t\r\n').startswith(TEXT_MARKERS):
+        return "text"
+    if len(head) >= 8 and head[4:8] in KNOWN_BOXES:
+        return "mp4"
+    if head[:1] == b'\x47':
+        return "mpegts"
+    if head[:4] == b'\x1a\x45\xdf\xa3':
+        return "matroska"
+    return "unknown"
+
+
+# ===== GATE =====
+
+def check_download(path, expected_duration=None, expected_size=None):
+    """Integrity report: {'ok', 'reason', 'container', 'duration', 'bitrate', 'size', 'sha256'}"""
+    report = {'ok': False, 'reason': "", 'container': None, 'duration': None,
+              'bitrate': None, 'size': 0, 'sha256': None}
+
+    if not os.path.exists(path):
+        report['reason'] = "file missing"
+        return report
+    size = report['size'] = os.path.getsize(path)
+    if size < MIN_FILE_BYTES:
+        report['reason'] = f"file too small ({size} bytes)"
+        return report
+    if expected_size and size != expected_size:
+        report['reason'] = f"size {size} != expected {expected_size}"
+        return report
+
+    container = report['container'] = detect_container(path)
+    if container == "mp4":
+        ok, reason, duration = scan_mp4(path, size)
+        report['duration'] = duration
+    elif container == "mpegts":
+        ok, reason = scan_mpegts(path, size)
+    elif container == "text":
+        ok, reason = False, "text, not media (playlist or error page?)"
+    else:
+        # No cheap structural check - one ffprobe call must at least find a duration
+        duration = report['duration'] = probe_duration(path) or None
+        ok = bool(duration)
+        reason = f"{container} container, ffprobe ok" if ok else f"{container} container without a duration"
+    report['reason'] = reason
+    if not ok:
+        return report
+
+    duration = report['duration']
+    if duration:
+        bitrate = report['bitrate'] = size * 8 / duration
+        if not MIN_BITRATE <= bitrate <= MAX_BITRATE:
+            report['reason'] = (f"{size / (1024 * 1024):.1f} MB for {duration:.0f}s "
+                                f"({bitrate / 1000:.0f} kbps) is implausible")
+            return report
+        if expected_duration and duration < expected_duration * (1 - DURATION_TOLERANCE):
+            report['reason'] = f"duration {duration:.0f}s, playlist says {expected_duration:.0f}s"
+            return report
+
+    report['sha256'] = file_sha256(path)
+    report['ok'] = True
+    return report
+
+
+def print_report(report):
+    if report['ok']:
+        details = [report['reason']]
+        if report['duration']:
+            details.append(f"{report['duration']:.0f}s")
+        if report['bitrate']:
+            details.append(f"{report['bitrate'] / 1000:.0f} kbps")
+        print(f"🛡️ Integrity ok: {', '.join(details)}, sha256 {report['sha256'][:12]}…")
+    else:
+        print(f"🧨 Integrity check failed: {report['reason']}")
+
+
+def download_verified(download, url, output_path, expected_duration=None, retries=INTEGRITY_RETRIES):
+    """download(url, output_path) through the gate; broken files are downloaded again
+
+    Returns (True, report) or (False, message); a broken file is removed.
+    """
+    report = None
+    for attempt in range(retries + 1):
+        if attempt:
+            print(f"🔁 Downloading again ({attempt}/{retries})...")
+            remove_file(output_path)
+        if not download(url, output_path):
+            return False, "Download failed"
+        report = check_download(output_path, expected_duration)
+        print_report(report)
+        if report['ok']:
+            return True, report
+    remove_file(output_path)
+    return False, f"Downloaded file is broken: {report['reason']}"
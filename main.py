@@ -10,11 +10,13 @@ import time
 import json
 import requests
 import subprocess
-import shutil
 import asyncio
+import argparse
 import hashlib
+import threading
+import contextvars
 from datetime import datetime
-from urllib.parse import urlparse, parse_qs
+from urllib.parse import urlparse, parse_qs, urljoin
 
 # ===== CONFIGURATION =====
 # Get from GitHub Secrets
@@ -51,10 +53,13 @@ def validate_env():
     print("✅ Environment variables validated")
     return True
 
-if not validate_env():
+# --resolve-only exercises URL extraction alone and needs no Telegram credentials
+RESOLVE_ONLY = "--resolve-only" in sys.argv
+
+if not RESOLVE_ONLY and not validate_env():
     sys.exit(1)
 
-TELEGRAM_API_ID = int(TELEGRAM_API_ID)
+TELEGRAM_API_ID = int(TELEGRAM_API_ID) if TELEGRAM_API_ID.isdigit() else 0
 
 # Multiple User-Agents to rotate
 USER_AGENTS = [
@@ -123,8 +128,30 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.options import Options
 
+from encoding_profiles import (load_profile, build_encode_args, describe_profile,
+                               parse_output_ladder, encode_ladder)
+from extractor_stats import ExtractorStats
+from prefetch import UrlPrefetcher
+from circuit_breaker import CircuitBreaker
+from hedging import MirrorLatency, hedged_get
+from workfiles import WorkDir, place_file
+from ffmpeg_progress import run_ffmpeg
+from thumbnails import create_thumbnail
+import metrics
+from preflight import (plan_compression, print_plan, remux_to_mp4, log_outcome,
+                       probe_media, ACTION_PASSTHROUGH, ACTION_REMUX)
+from claims import shard_items, ClaimTable, CLAIM_DB, CLAIM_POLL_SECONDS, WORKER_ID, SHARD_INDEX, SHARD_COUNT
+from resolve_only import count_request, note_strategy, parse_items, resolve_all, print_table
+from host_limiter import HostLimiter, is_throttle_error
+from integrity import download_verified
+from splitter import upload_in_parts
+from checkpoints import Checkpoint, CHECKPOINT_DIR, STAGE_URL, STAGE_DOWNLOAD, STAGE_THUMBNAIL, STAGE_COMPRESS
+
 app = None
 
+# Episodes to resolve ahead of the one being processed
+PREFETCH_AHEAD = int(os.environ.get("PREFETCH_AHEAD", "2"))
+
 # ===== TELEGRAM SETUP =====
 
 async def setup_telegram():
@@ -242,11 +269,24 @@ def generate_dynamic_code(episode_num):
     
     return code
 
-def get_video_url_with_selenium(base_url):
-    """Use Selenium to get the final redirected URL"""
-    try:
-        print("🖥️ Using Selenium to get page...")
-        
+# ===== WARM SESSIONS =====
+# One cloudscraper session (keeps Cloudflare clearance cookies and pooled
+# connections) and one headless browser, reused across episodes and jobs
+scraper_session = None
+selenium_driver = None
+selenium_lock = threading.Lock()
+
+def get_scraper():
+    """Shared cloudscraper session"""
+    global scraper_session
+    if scraper_session is None:
+        scraper_session = cloudscraper.create_scraper()
+    return scraper_session
+
+def get_driver():
+    """Shared headless Chrome, started on first use"""
+    global selenium_driver
+    if selenium_driver is None:
         # Set up Chrome options
         chrome_options = Options()
         chrome_options.add_argument('--headless')
@@ -256,11 +296,32 @@ def get_video_url_with_selenium(base_url):
         chrome_options.add_argument('--window-size=1920,1080')
         chrome_options.add_argument(f'--user-agent={USER_AGENTS[0]}')
         
-        # Create driver
-        driver = webdriver.Chrome(options=chrome_options)
+        selenium_driver = webdriver.Chrome(options=chrome_options)
+    return selenium_driver
+
+def close_driver():
+    global selenium_driver
+    if selenium_driver is not None:
+        try:
+            selenium_driver.quit()
+        except:
+            pass
+        selenium_driver = None
+
+def get_video_url_with_selenium(base_url):
+    """Use Selenium to get the final redirected URL"""
+    # The driver isn't thread-safe - one page at a time
+    with selenium_lock:
+        try:
+            print("🖥️ Using Selenium to get page...")
+            driver = get_driver()
+        except Exception as e:
+            print(f"❌ Selenium setup error: {e}")
+            return None
         
         try:
             # Navigate to URL
+            count_request()
             driver.get(base_url)
             
             # Wait for page to load
@@ -272,142 +333,339 @@ def get_video_url_with_selenium(base_url):
             current_url = driver.current_url
             
             print(f"🌐 Selenium got URL: {current_url}")
-            
-            driver.quit()
             return current_url
             
         except Exception as e:
             print(f"❌ Selenium error: {e}")
-            try:
-                driver.quit()
-            except:
-                pass
+            # Start a fresh browser next time
+            close_driver()
             return None
-            
+
+# ===== EXTRACTOR REGISTRY =====
+# Each extractor: func(episode_num, series_name, season_num) -> video URL or None
+# "cost" is the nominal latency in seconds, used until real stats exist
+EXTRACTORS = []
+extractor_stats = ExtractorStats()
+# Hosts the running extractor reached (copied into hedge threads with the context)
+extractor_attempt = contextvars.ContextVar("extractor_attempt", default=None)
+
+def register_extractor(name, cost):
+    """Register an extraction strategy"""
+    def decorator(func):
+        EXTRACTORS.append({'name': name, 'cost': cost, 'func': func})
+        return func
+    return decorator
+
+def note_host(url, produced=False, skipped=False):
+    """Record a request of the running extractor: made, skipped by the breaker, or the one that produced the video"""
+    attempt = extractor_attempt.get()
+    if attempt is None:
+        return
+    if skipped:
+        attempt['skipped'] += 1
+        return
+    host = urlparse(url).netloc.lower()
+    if host not in attempt['hosts']:
+        attempt['hosts'].append(host)
+    if produced:
+        attempt['source'] = host
+
+def episode_slug(series_name, season_num, episode_num):
+    """Episode slug without the 4-character suffix"""
+    return f"modablaj-{series_name}-episode-s{season_num:02d}e{episode_num:02d}"
+
+# Mirrors that are down get skipped for a while (shared across episodes)
+domain_breaker = CircuitBreaker(
+    threshold=int(os.environ.get("BREAKER_THRESHOLD", "3")),
+    cooldown=int(os.environ.get("BREAKER_COOLDOWN", "120"))
+)
+
+# Mirror domains serving the same content, ordered by measured latency when hedging
+MIRRORS = ["z.3seq.cam", "3seq.cam", "z.3seq.com", "3seq.com"]
+mirror_latency = MirrorLatency()
+
+# Per-host AIMD concurrency for scraping and CDN requests
+host_limiter = HostLimiter()
+
+def guarded_get(scraper, url, timeout):
+    """GET through the per-domain circuit breaker (None if the domain is skipped)"""
+    if not domain_breaker.allow(url):
+        print(f"⛔ Skipping {urlparse(url).netloc} (circuit open)")
+        note_host(url, skipped=True)
+        return None
+    count_request()
+    note_host(url)
+    try:
+        response = host_limiter.get(scraper.get, url, timeout=timeout)
     except Exception as e:
-        print(f"❌ Selenium setup error: {e}")
+        domain_breaker.record_failure(url, type(e).__name__)
+        raise
+    domain_breaker.record_response(url, response.status_code)
+    return response
+
+def fetch_watch_page(url, timeout=15):
+    """Fetch a watch page and extract the video URL from it"""
+    # Use cloudscraper to bypass Cloudflare
+    scraper = get_scraper()
+    response = guarded_get(scraper, url, timeout)
+    
+    if response is None:
         return None
+    
+    if response.status_code != 200:
+        print(f"❌ Pattern failed: {response.status_code}")
+        return None
+    
+    print(f"✅ Pattern works: {url}")
+    video_url = extract_video_from_html(response.text, url)
+    if not video_url:
+        print("⚠️ Found page but no video URL")
+    else:
+        note_host(url, produced=True)
+    return video_url
 
-def extract_video_url_advanced(episode_num, series_name, season_num):
-    """Advanced method to extract video URL"""
-    try:
-        print(f"🎯 Episode {episode_num}: Advanced extraction started")
-        
-        # Try multiple approaches
-        
-        # APPROACH 1: Try with generated dynamic code
-        dynamic_code = generate_dynamic_code(episode_num)
-        print(f"🔑 Generated dynamic code: {dynamic_code}")
-        
-        # Try different URL patterns
-        url_patterns = [
-            f"https://z.3seq.cam/video/modablaj-{series_name}-episode-s{season_num:02d}e{episode_num:02d}-{dynamic_code}/?do=watch",
-            f"https://3seq.cam/video/modablaj-{series_name}-episode-s{season_num:02d}e{episode_num:02d}-{dynamic_code}/?do=watch",
-            f"https://z.3seq.com/video/modablaj-{series_name}-episode-s{season_num:02d}e{episode_num:02d}-{dynamic_code}/?do=watch",
-            f"https://3seq.com/video/modablaj-{series_name}-episode-s{season_num:02d}e{episode_num:02d}-{dynamic_code}/?do=watch",
-        ]
-        
-        for url in url_patterns:
-            print(f"🔗 Trying pattern: {url}")
-            try:
-                # Use cloudscraper to bypass Cloudflare
-                scraper = cloudscraper.create_scraper()
-                
-                # Try to get the page
-                response = scraper.get(url, timeout=15)
+# ===== SEASON INDEX =====
+# episode -> watch URL maps, one listing crawl per (series, season)
+SEASON_INDEX = {}
+SEASON_INDEX_URL = None  # optional "index_url" from series_config.json
+SEASON_INDEX_MAX_PAGES = 5
+
+def season_index_candidates(series_name, season_num):
+    """Listing pages that link to every episode of the season"""
+    if SEASON_INDEX_URL:
+        return [SEASON_INDEX_URL]
+    return [
+        f"https://z.3seq.cam/series/modablaj-{series_name}/",
+        f"https://z.3seq.cam/series/{series_name}/",
+        f"https://z.3seq.cam/?s={series_name}",
+    ]
+
+def parse_episode_links(html, page_url, series_name, season_num):
+    """Parse every episode link on a listing page into {episode: watch URL}"""
+    pattern = (r'href=["\']([^"\']*/video/modablaj-' + re.escape(series_name) +
+               r'-episode-s(\d+)e(\d+)-([a-z0-9]+)/?)[^"\']*["\']')
+    episodes = {}
+    for link, season, episode, _code in re.findall(pattern, html, re.IGNORECASE):
+        if int(season) != season_num:
+            continue
+        link = urljoin(page_url, link)
+        if not link.endswith('/'):
+            link += '/'
+        episodes.setdefault(int(episode), link + '?do=watch')
+    return episodes
+
+def find_next_page(html, page_url):
+    """Find the rel=next / page-N link of a paginated listing"""
+    match = re.search(r'<a[^>]+rel=["\']next["\'][^>]*href=["\']([^"\']+)["\']', html, re.IGNORECASE)
+    if not match:
+        match = re.search(r'<a[^>]+href=["\']([^"\']+)["\'][^>]*rel=["\']next["\']', html, re.IGNORECASE)
+    return urljoin(page_url, match.group(1)) if match else None
+
+def build_season_index(series_name, season_num, wanted_episodes=None):
+    """Crawl the season listing once and map episodes to watch URLs"""
+    key = (series_name, season_num)
+    if key in SEASON_INDEX:
+        return SEASON_INDEX[key]
+    
+    print(f"📚 Building season index for {series_name} S{season_num:02d}...")
+    episodes = {}
+    scraper = get_scraper()
+    
+    for index_url in season_index_candidates(series_name, season_num):
+        page_url = index_url
+        pages = 0
+        try:
+            while page_url and pages < SEASON_INDEX_MAX_PAGES:
+                response = guarded_get(scraper, page_url, 15)
+                if response is None:
+                    break
+                pages += 1
+                if response.status_code != 200:
+                    print(f"⚠️ Index page failed: {response.status_code} ({page_url})")
+                    break
                 
-                if response.status_code == 200:
-                    print(f"✅ Pattern works: {url}")
-                    
-                    # Now extract video URL from this page
-                    video_url = extract_video_from_html(response.text, url)
-                    if video_url:
-                        print(f"✅ Video URL found: {video_url[:80]}...")
-                        return video_url, "✅ Success with generated code"
-                    else:
-                        print("⚠️ Found page but no video URL")
-                else:
-                    print(f"❌ Pattern failed: {response.status_code}")
-                    
-            except Exception as e:
-                print(f"❌ Error with pattern: {str(e)[:50]}")
-        
-        # APPROACH 2: Try to find the correct URL by scanning
-        print("🔄 Trying to find correct URL by scanning...")
-        
-        # Try common codes based on observed patterns
-        common_codes = [
-            'fav4', 'avxn', 'd1bb', 'bx7q', 'c9w2', 'e5t1', 'f6y9', 'g7z4',
-            'h8x3', 'i9y2', 'j0z1', 'k1a8', 'l2b7', 'm3c6', 'n4d5', 'o5e4',
-            'p6f3', 'q7g2', 'r8h1', 's9i0', 't0j9', 'u1k8', 'v2l7', 'w3m6',
-            'x4n5', 'y5o4', 'z6p3'
-        ]
-        
-        for code in common_codes:
-            url = f"https://z.3seq.cam/video/modablaj-{series_name}-episode-s{season_num:02d}e{episode_num:02d}-{code}/?do=watch"
-            
-            try:
-                scraper = cloudscraper.create_scraper()
-                response = scraper.get(url, timeout=10)
+                episodes.update(parse_episode_links(response.text, page_url, series_name, season_num))
                 
-                if response.status_code == 200:
-                    print(f"✅ Found working code: {code}")
-                    
-                    video_url = extract_video_from_html(response.text, url)
-                    if video_url:
-                        return video_url, f"✅ Success with code {code}"
-                        
-            except:
-                continue
-        
-        # APPROACH 3: Try to use yt-dlp directly
-        print("🔄 Trying yt-dlp directly...")
-        
-        # Try base URL first
-        base_url = f"https://z.3seq.cam/video/modablaj-{series_name}-episode-s{season_num:02d}e{episode_num:02d}"
-        
-        ydl_opts = {
-            'quiet': True,
-            'no_warnings': True,
-            'extract_flat': True,
-        }
+                # Only follow pagination while requested episodes are still missing
+                if wanted_episodes is None or set(wanted_episodes) <= set(episodes):
+                    break
+                page_url = find_next_page(response.text, page_url)
+        except Exception as e:
+            print(f"⚠️ Index error: {str(e)[:50]}")
         
+        if episodes:
+            print(f"✅ Season index: {len(episodes)} episodes from {index_url} ({pages} page(s))")
+            break
+    
+    if not episodes:
+        print("⚠️ Season index not available, falling back to URL guessing")
+    
+    # Cache even when empty so a missing index costs one attempt per run
+    SEASON_INDEX[key] = episodes
+    return episodes
+
+@register_extractor("season_index", cost=1)
+def extract_with_season_index(episode_num, series_name, season_num):
+    """Look the episode up in the crawled season index"""
+    watch_url = build_season_index(series_name, season_num).get(episode_num)
+    if not watch_url:
+        return None
+    
+    print(f"📚 Index URL: {watch_url}")
+    try:
+        return fetch_watch_page(watch_url, timeout=15)
+    except Exception as e:
+        print(f"❌ Index URL error: {str(e)[:50]}")
+        return None
+
+@register_extractor("generated_code", cost=4)
+def extract_with_generated_code(episode_num, series_name, season_num):
+    """Try the watch URL with the generated dynamic code, hedged across mirrors"""
+    dynamic_code = generate_dynamic_code(episode_num)
+    print(f"🔑 Generated dynamic code: {dynamic_code}")
+    
+    slug = episode_slug(series_name, season_num, episode_num)
+    url_patterns = [f"https://{mirror}/video/{slug}-{dynamic_code}/?do=watch" for mirror in MIRRORS]
+    
+    scraper = get_scraper()
+    
+    def video_from_page(url, response):
+        print(f"✅ Pattern works: {url}")
+        video_url = extract_video_from_html(response.text, url)
+        if not video_url:
+            print(f"⚠️ Found page but no video URL ({urlparse(url).netloc}), trying other mirrors")
+        return video_url
+    
+    url, video_url = hedged_get(url_patterns, lambda u: guarded_get(scraper, u, 15), mirror_latency,
+                                accept=video_from_page)
+    
+    if not video_url:
+        print("❌ No mirror returned a page with a video")
+        return None
+    note_host(url, produced=True)
+    return video_url
+
+@register_extractor("common_codes", cost=30)
+def extract_with_common_codes(episode_num, series_name, season_num):
+    """Scan codes observed on the site"""
+    print("🔄 Trying to find correct URL by scanning...")
+    
+    common_codes = [
+        'fav4', 'avxn', 'd1bb', 'bx7q', 'c9w2', 'e5t1', 'f6y9', 'g7z4',
+        'h8x3', 'i9y2', 'j0z1', 'k1a8', 'l2b7', 'm3c6', 'n4d5', 'o5e4',
+        'p6f3', 'q7g2', 'r8h1', 's9i0', 't0j9', 'u1k8', 'v2l7', 'w3m6',
+        'x4n5', 'y5o4', 'z6p3'
+    ]
+    
+    slug = episode_slug(series_name, season_num, episode_num)
+    for code in common_codes:
+        url = f"https://z.3seq.cam/video/{slug}-{code}/?do=watch"
         try:
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                info = ydl.extract_info(base_url, download=False)
-                
-                if info and 'url' in info:
-                    video_url = info['url']
-                    return video_url, "✅ Success with yt-dlp"
-                    
+            video_url = fetch_watch_page(url, timeout=10)
+            if video_url:
+                print(f"✅ Found working code: {code}")
+                return video_url
         except:
-            pass
-        
-        # APPROACH 4: Try with selenium to get the actual page
-        print("🔄 Trying with Selenium...")
-        
-        base_url = f"https://z.3seq.cam/video/modablaj-{series_name}-episode-s{season_num:02d}e{episode_num:02d}"
-        final_url = get_video_url_with_selenium(base_url)
+            continue
+    
+    return None
+
+@register_extractor("yt_dlp", cost=5)
+def extract_with_ytdlp(episode_num, series_name, season_num):
+    """Let yt-dlp resolve the base episode URL"""
+    print("🔄 Trying yt-dlp directly...")
+    
+    base_url = f"https://z.3seq.cam/video/{episode_slug(series_name, season_num, episode_num)}"
+    if domain_breaker.is_open(base_url):
+        print("⛔ Skipping yt-dlp (circuit open)")
+        note_host(base_url, skipped=True)
+        return None
+    
+    ydl_opts = {
+        'quiet': True,
+        'no_warnings': True,
+        'extract_flat': True,
+    }
+    
+    try:
+        count_request()
+        note_host(base_url)
+        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+            info = ydl.extract_info(base_url, download=False)
+            if info and 'url' in info:
+                note_host(base_url, produced=True)
+                return info['url']
+    except:
+        pass
+    
+    return None
+
+@register_extractor("selenium", cost=20)
+def extract_with_selenium(episode_num, series_name, season_num):
+    """Follow redirects in a real browser, then scrape the watch page"""
+    print("🔄 Trying with Selenium...")
+    
+    base_url = f"https://z.3seq.cam/video/{episode_slug(series_name, season_num, episode_num)}"
+    if domain_breaker.is_open(base_url):
+        print("⛔ Skipping Selenium (circuit open)")
+        note_host(base_url, skipped=True)
+        return None
+    
+    note_host(base_url)
+    final_url = get_video_url_with_selenium(base_url)
+    
+    if not final_url:
+        return None
+    
+    # Add watch parameter
+    if not final_url.endswith('/'):
+        final_url += '/'
+    watch_url = final_url + '?do=watch'
+    
+    print(f"🎯 Watch URL from Selenium: {watch_url}")
+    
+    try:
+        return fetch_watch_page(watch_url, timeout=15)
+    except:
+        return None
+
+def extract_video_url_advanced(episode_num, series_name, season_num):
+    """Advanced method to extract video URL (cheapest, most successful extractor first)"""
+    try:
+        print(f"🎯 Episode {episode_num}: Advanced extraction started")
         
-        if final_url:
-            # Add watch parameter
-            if not final_url.endswith('/'):
-                final_url += '/'
-            watch_url = final_url + '?do=watch'
+        # Order by the mirror we'd reach first; record under the mirrors actually used
+        first_mirror = urlparse(mirror_latency.order([f"https://{m}/" for m in MIRRORS])[0]).netloc
+        scopes = [f"series:{series_name}", f"host:{first_mirror}"]
+        ordered = extractor_stats.order(scopes, EXTRACTORS)
+        print(f"📋 Extractor order: {', '.join(e['name'] for e in ordered)}")
+        
+        for extractor in ordered:
+            print(f"🧪 {extractor['name']} ({extractor_stats.describe(scopes, extractor['name'])})")
+            start = time.time()
+            attempt = {'hosts': [], 'source': None, 'skipped': 0}
+            token = extractor_attempt.set(attempt)
+            try:
+                video_url = extractor['func'](episode_num, series_name, season_num)
+            except Exception as e:
+                print(f"❌ {extractor['name']} error: {str(e)[:50]}")
+                video_url = None
+            finally:
+                extractor_attempt.reset(token)
             
-            print(f"🎯 Watch URL from Selenium: {watch_url}")
+            if attempt['skipped'] and not attempt['hosts']:
+                # Nothing was tried - an open breaker says nothing about the extractor
+                print(f"⏭️ {extractor['name']} not recorded (every request skipped)")
+            else:
+                hosts = [attempt['source']] if video_url and attempt['source'] else attempt['hosts']
+                record_scopes = [f"series:{series_name}"] + [f"host:{host}" for host in hosts]
+                extractor_stats.record(record_scopes, extractor['name'], bool(video_url), time.time() - start)
+                extractor_stats.save()
             
-            # Now try to get the video from this URL
-            try:
-                scraper = cloudscraper.create_scraper()
-                response = scraper.get(watch_url, timeout=15)
-                
-                if response.status_code == 200:
-                    video_url = extract_video_from_html(response.text, watch_url)
-                    if video_url:
-                        return video_url, "✅ Success with Selenium"
-            except:
-                pass
+            if video_url:
+                print(f"✅ Video URL found: {video_url[:80]}...")
+                note_strategy(extractor['name'])
+                return video_url, f"✅ Success with {extractor['name']}"
         
         return None, "❌ All extraction methods failed"
         
@@ -510,8 +768,13 @@ def download_video(url, output_path):
             'http_headers': get_headers(),
             'retries': 15,
             'fragment_retries': 15,
-            'skip_unavailable_fragments': True,
+            # A skipped fragment leaves a gap the integrity gate can't see without
+            # a playlist duration - fail instead, so the download is retried
+            'skip_unavailable_fragments': False,
             'socket_timeout': 30,
+            # Fragment parallelism follows the CDN host's AIMD window
+            'concurrent_fragment_downloads': host_limiter.limit(url),
+            'progress_hooks': [metrics.ytdlp_progress_hook()],
             'extractor_args': {
                 'generic': {
                     'no_check_certificate': True
@@ -530,6 +793,7 @@ def download_video(url, output_path):
             ydl.download([url])
         
         elapsed = time.time() - start
+        host_limiter.record_success(url)
         
         # Check if file was downloaded
         if os.path.exists(output_path):
@@ -543,7 +807,7 @@ def download_video(url, output_path):
             test_file = base_name + ext
             if os.path.exists(test_file):
                 if test_file != output_path:
-                    shutil.move(test_file, output_path)
+                    place_file(test_file, output_path, keep_source=False)
                 size = os.path.getsize(output_path) / (1024*1024)
                 print(f"✅ Downloaded in {elapsed:.1f}s ({size:.1f}MB)")
                 return True
@@ -552,6 +816,8 @@ def download_video(url, output_path):
         
     except Exception as e:
         print(f"❌ Download error: {str(e)[:100]}")
+        if is_throttle_error(e):
+            host_limiter.record_throttle(url, "download throttled")
         return False
 
 def compress_video(input_file, output_file):
@@ -564,22 +830,40 @@ def compress_video(input_file, output_file):
     print(f"🎬 Compressing video...")
     print(f"📊 Original: {original_size:.1f}MB")
     
+    profile = load_profile()
+    print(f"🎛️ Profile: {describe_profile(profile)}")
+    
+    # Preflight: sample encode to decide if a full transcode is worth it
+    plan = plan_compression(input_file, profile)
+    print_plan(plan)
+    
+    if plan['action'] == ACTION_PASSTHROUGH:
+        print("📊 Using original without compression")
+        start = time.time()
+        place_file(input_file, output_file)
+        log_outcome(plan, output_file, time.time() - start)
+        return True
+    
+    if plan['action'] == ACTION_REMUX:
+        print("📦 Remuxing to mp4 without re-encoding...")
+        start = time.time()
+        if remux_to_mp4(input_file, output_file):
+            log_outcome(plan, output_file, time.time() - start)
+            return True
+        print("⚠️ Remux failed, falling back to transcode")
+    
     cmd = [
         'ffmpeg',
         '-i', input_file,
         '-vf', 'scale=-2:240',
-        '-c:v', 'libx264',
-        '-crf', '28',
-        '-preset', 'veryfast',
-        '-c:a', 'aac',
-        '-b:a', '64k',
+        *build_encode_args(profile),
         '-y',
         output_file
     ]
     
     try:
         start = time.time()
-        result = subprocess.run(cmd, capture_output=True, text=True)
+        result = run_ffmpeg(cmd, timeout=None, on_progress=metrics.encode_progress_tracker())
         
         if result.returncode == 0 and os.path.exists(output_file):
             new_size = os.path.getsize(output_file) / (1024 * 1024)
@@ -588,45 +872,19 @@ def compress_video(input_file, output_file):
             
             print(f"✅ Compressed in {elapsed:.1f}s")
             print(f"📊 New size: {new_size:.1f}MB (-{reduction:.1f}%)")
+            log_outcome(plan, output_file, elapsed)
             return True
         else:
             print(f"❌ Compression failed")
+            if result.stalled:
+                print("🧊 Encode stalled and was stopped")
             if result.stderr:
-                print(f"Error: {result.stderr[:200]}")
+                print(f"Error: {result.stderr[-500:]}")
             return False
     except Exception as e:
         print(f"❌ Compression error: {e}")
         return False
 
-def create_thumbnail(input_file, thumbnail_path):
-    """Create thumbnail from video"""
-    try:
-        print(f"🖼️ Creating thumbnail...")
-        
-        cmd = [
-            'ffmpeg',
-            '-i', input_file,
-            '-ss', '00:00:05',
-            '-vframes', '1',
-            '-s', '320x180',
-            '-f', 'image2',
-            '-y',
-            thumbnail_path
-        ]
-        
-        result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
-        
-        if result.returncode == 0 and os.path.exists(thumbnail_path):
-            size = os.path.getsize(thumbnail_path) / 1024
-            print(f"✅ Thumbnail created ({size:.1f}KB)")
-            return True
-        
-        return False
-        
-    except Exception as e:
-        print(f"❌ Thumbnail error: {e}")
-        return False
-
 def get_video_dimensions(input_file):
     """Get video dimensions"""
     try:
@@ -668,7 +926,7 @@ def get_video_duration(input_file):
     
     return 0
 
-async def upload_video(file_path, caption, thumbnail_path=None):
+async def upload_video(file_path, caption, thumbnail_path=None, chat_id=None):
     """Upload video to Telegram channel"""
     try:
         if not app or not os.path.exists(file_path):
@@ -688,7 +946,7 @@ async def upload_video(file_path, caption, thumbnail_path=None):
         
         # Prepare upload
         upload_params = {
-            'chat_id': TELEGRAM_CHANNEL,
+            'chat_id': chat_id or TELEGRAM_CHANNEL,
             'video': file_path,
             'caption': caption,
             'supports_streaming': True,
@@ -703,9 +961,11 @@ async def upload_video(file_path, caption, thumbnail_path=None):
         # Upload with progress
         start_time = time.time()
         last_percent = 0
+        upload_metrics = metrics.progress_tracker("upload")
         
         def progress(current, total):
             nonlocal last_percent
+            upload_metrics(current)
             percent = (current / total) * 100
             if percent - last_percent >= 5 or percent == 100:
                 speed = current / (time.time() - start_time) / 1024 if (time.time() - start_time) > 0 else 0
@@ -725,7 +985,7 @@ async def upload_video(file_path, caption, thumbnail_path=None):
         except FloodWait as e:
             print(f"⏳ Flood wait: {e.value}s")
             await asyncio.sleep(e.value)
-            return await upload_video(file_path, caption, thumbnail_path)
+            return await upload_video(file_path, caption, thumbnail_path, chat_id)
             
         except Exception as e:
             print(f"❌ Upload error: {e}")
@@ -743,79 +1003,169 @@ async def upload_video(file_path, caption, thumbnail_path=None):
         print(f"❌ Upload failed: {e}")
         return False
 
-async def process_episode(episode_num, series_name, series_name_arabic, season_num, download_dir):
-    """Process a single episode"""
-    print(f"\n{'─'*50}")
-    print(f"🎬 Episode {episode_num:02d}")
-    print(f"{'─'*50}")
+# Extra passes over failed episodes at the end of a run
+EPISODE_RETRIES = int(os.environ.get("EPISODE_RETRIES", "1"))
+
+# Renditions to produce (series_config.json "output_ladder", e.g. [240, 360])
+OUTPUT_LADDER = parse_output_ladder(None, TELEGRAM_CHANNEL)
+
+def ladder_stage(height):
+    """Checkpoint stage of one encoded rendition"""
+    return f"ladder_{height}p"
+
+def ladder_encoded(checkpoint):
+    """True when every configured rendition has a checkpointed file"""
+    return all(checkpoint.get(ladder_stage(r['height'])) for r in OUTPUT_LADDER)
+
+async def process_ladder(work, source_file, caption, checkpoint):
+    """Encode the output ladder from a single decode and upload each rendition to its channel
+
+    Finished renditions and uploads are checkpointed: a retry encodes and
+    uploads only what is missing.
+    """
+    outputs = [(r['height'], work.file(f"final_{r['height']}p.mp4")) for r in OUTPUT_LADDER]
+    missing = [(height, path) for height, path in outputs if not checkpoint.get(ladder_stage(height))]
     
-    temp_file = os.path.join(download_dir, f"temp_{episode_num:02d}.mp4")
-    final_file = os.path.join(download_dir, f"final_{episode_num:02d}.mp4")
-    thumbnail_file = os.path.join(download_dir, f"thumb_{episode_num:02d}.jpg")
+    if missing:
+        print(f"🎬 Encoding renditions: {', '.join(f'{h}p' for h, _ in missing)}")
+        with metrics.stage("encode"):
+            status = encode_ladder(source_file, missing, on_progress=metrics.encode_progress_tracker(), timeout=3600)
+        for height, path in missing:
+            if status.get(height):
+                checkpoint.done(ladder_stage(height), file=path)
+    else:
+        print("♻️ Using checkpointed renditions")
     
-    # Clean old files
-    for f in [temp_file, final_file, thumbnail_file]:
-        if os.path.exists(f):
-            try:
-                os.remove(f)
-            except:
-                pass
+    ready = [(r, path) for r, (height, path) in zip(OUTPUT_LADDER, outputs) if checkpoint.get(ladder_stage(height))]
+    if not ready:
+        return False, "Compression failed"
     
-    try:
-        # 1. Extract URL using advanced method
-        print("🔍 Extracting video URL (advanced method)...")
-        video_url, message = extract_video_url_advanced(episode_num, series_name, season_num)
-        
-        if not video_url:
-            return False, f"URL extraction failed: {message}"
-        
-        print(f"{message}")
-        
-        # 2. Download
-        print("📥 Downloading video...")
-        if not download_video(video_url, temp_file):
-            return False, "Download failed"
-        
-        # 3. Create thumbnail
+    thumb_record = checkpoint.get(STAGE_THUMBNAIL)
+    thumbnail_file = work.file("thumb.jpg")
+    if not thumb_record:
         print("🖼️ Creating thumbnail...")
-        create_thumbnail(temp_file, thumbnail_file)
-        
-        # 4. Compress
-        print("🎬 Compressing video...")
-        if not compress_video(temp_file, final_file):
-            print("⚠️ Compression failed, using original")
-            shutil.copy2(temp_file, final_file)
-        
-        # 5. Upload
-        caption = f"{series_name_arabic} الموسم {season_num} الحلقة {episode_num}"
-        thumb = thumbnail_file if os.path.exists(thumbnail_file) else None
-        
-        if await upload_video(final_file, caption, thumb):
-            # 6. Clean up
-            for file_path in [temp_file, final_file, thumbnail_file]:
-                if os.path.exists(file_path):
-                    try:
-                        os.remove(file_path)
-                        print(f"🗑️ Deleted: {os.path.basename(file_path)}")
-                    except:
-                        pass
-            return True, "✅ Uploaded and cleaned"
-        else:
-            return False, "❌ Upload failed"
+        if create_thumbnail(ready[0][1], thumbnail_file):
+            thumb_record = checkpoint.done(STAGE_THUMBNAIL, file=thumbnail_file)
+    thumb = thumb_record['file'] if thumb_record else None
+    
+    with metrics.stage("upload"):
+        results = await asyncio.gather(*[
+            upload_in_parts(upload_video, work, path, caption, thumb, chat_id=rendition['channel'],
+                            checkpoint=checkpoint)
+            for rendition, path in ready
+        ])
+    
+    uploaded = [f"{r['height']}p→{r['channel']}" for (r, _), ok in zip(ready, results) if ok]
+    if len(uploaded) < len(OUTPUT_LADDER):
+        return False, f"❌ Uploaded {len(uploaded)}/{len(OUTPUT_LADDER)} renditions: {', '.join(uploaded) or 'none'}"
+    return True, f"✅ Uploaded {', '.join(uploaded)} and cleaned"
+
+async def process_episode(episode_num, series_name, series_name_arabic, season_num, download_dir, prefetcher=None):
+    """Process a single episode, resuming from its checkpoints"""
+    print(f"\n{'─'*50}")
+    print(f"🎬 Episode {episode_num:02d}")
+    print(f"{'─'*50}")
+    
+    # Per-episode working dir: removed on success, kept with its checkpoints on failure
+    with WorkDir(f"{series_name}_s{season_num:02d}_e{episode_num:02d}", base=download_dir) as work:
+        work.keep = True
+        checkpoint = Checkpoint(work.path)
+        temp_file = work.file("temp.mp4")
+        final_file = work.file("final.mp4")
+        thumbnail_file = work.file("thumb.jpg")
+        
+        finished = checkpoint.finished()
+        if finished:
+            print(f"♻️ Resuming from checkpoint (done: {', '.join(finished)})")
         
-    except Exception as e:
-        print(f"❌ Processing error: {e}")
-        return False, str(e)
+        try:
+            compressed_record = checkpoint.get(STAGE_COMPRESS)
+            # The ladder has its own per-rendition records instead of the compress stage
+            encoded = ladder_encoded(checkpoint) if OUTPUT_LADDER else compressed_record
+            
+            if not encoded and not checkpoint.get(STAGE_DOWNLOAD):
+                # 1. Extract URL using advanced method
+                url_record = checkpoint.get(STAGE_URL)
+                if url_record:
+                    video_url, message = url_record["url"], "♻️ Using checkpointed URL"
+                else:
+                    print("🔍 Extracting video URL (advanced method)...")
+                    with metrics.stage("resolve"):
+                        if prefetcher:
+                            video_url, message = await prefetcher.get(episode_num)
+                        else:
+                            video_url, message = extract_video_url_advanced(episode_num, series_name, season_num)
+                    
+                    if not video_url:
+                        return False, f"URL extraction failed: {message}"
+                    checkpoint.done(STAGE_URL, url=video_url, message=message)
+                
+                print(f"{message}")
+                
+                # 2. Download, through the integrity gate: broken files are
+                # downloaded again instead of reaching the encoder/uploader
+                print("📥 Downloading video...")
+                with metrics.stage("download"):
+                    downloaded, report = download_verified(download_video, video_url, temp_file)
+                if not downloaded:
+                    # The URL may be what broke - resolve again next time
+                    checkpoint.invalidate(STAGE_URL)
+                    return False, report
+                checkpoint.done(STAGE_DOWNLOAD, file=temp_file, sha256=report['sha256'],
+                                duration=report['duration'])
+            
+            caption = f"{series_name_arabic} الموسم {season_num} الحلقة {episode_num}"
+            
+            # Output ladder: every rendition from one decode, one upload per channel
+            if OUTPUT_LADDER:
+                success, message = await process_ladder(work, temp_file, caption, checkpoint)
+                work.keep = not success
+                return success, message
+            
+            # 3. Create thumbnail
+            if not checkpoint.get(STAGE_THUMBNAIL):
+                print("🖼️ Creating thumbnail...")
+                source = temp_file if os.path.exists(temp_file) else final_file
+                if create_thumbnail(source, thumbnail_file):
+                    checkpoint.done(STAGE_THUMBNAIL, file=thumbnail_file)
+            
+            # 4. Compress
+            if compressed_record:
+                probe = compressed_record.get("probe") or {}
+                print(f"♻️ Using checkpointed compressed file ({compressed_record['size'] / (1024 * 1024):.1f} MB"
+                      f", {probe.get('height', '?')}p)")
+            else:
+                print("🎬 Compressing video...")
+                with metrics.stage("encode"):
+                    compressed = compress_video(temp_file, final_file)
+                if not compressed:
+                    print("⚠️ Compression failed, using original")
+                    place_file(temp_file, final_file, keep_source=False)
+                checkpoint.done(STAGE_COMPRESS, file=final_file, probe=probe_media(final_file))
+            
+            # 5. Upload
+            thumb = thumbnail_file if os.path.exists(thumbnail_file) else None
+            
+            with metrics.stage("upload"):
+                uploaded = await upload_in_parts(upload_video, work, final_file, caption, thumb,
+                                                 checkpoint=checkpoint)
+            
+            if uploaded:
+                # 6. Working files and checkpoints are removed when the WorkDir closes
+                work.keep = False
+                print(f"🗑️ Cleaning working files of episode {episode_num:02d}")
+                return True, "✅ Uploaded and cleaned"
+            else:
+                return False, "❌ Upload failed (checkpoint kept, retry resumes at upload)"
+            
+        except Exception as e:
+            print(f"❌ Processing error: {e}")
+            return False, str(e)
 
 # ===== MAIN FUNCTION =====
 
-async def main():
-    """Main function"""
-    print("="*50)
-    print("🎬 GitHub Video Processor v4.0 (Advanced Extraction)")
-    print("="*50)
-    
-    # Check dependencies
+def check_dependencies():
+    """Check that ffmpeg is available (install it if not)"""
     print("\n🔍 Checking dependencies...")
     
     # Check ffmpeg
@@ -835,41 +1185,9 @@ async def main():
             print("✅ ffmpeg installed")
     except:
         print("❌ Cannot check ffmpeg")
-    
-    # Setup Telegram
-    print("\n" + "="*50)
-    if not await setup_telegram():
-        print("❌ Cannot continue without Telegram connection")
-        return
-    
-    # Load configuration
-    config_file = "series_config.json"
-    if not os.path.exists(config_file):
-        print(f"❌ Config file not found: {config_file}")
-        print("💡 Creating sample config...")
-        
-        sample_config = {
-            "series_name": "kiralik-ask",
-            "series_name_arabic": "كيراليك اسك",
-            "season_num": 1,
-            "start_episode": 1,
-            "end_episode": 10
-        }
-        
-        with open(config_file, 'w', encoding='utf-8') as f:
-            json.dump(sample_config, f, ensure_ascii=False, indent=2)
-        
-        print(f"✅ Created {config_file} with sample data")
-        print("⚠️ Please edit the config file and run again")
-        return
-    
-    try:
-        with open(config_file, 'r', encoding='utf-8') as f:
-            config = json.load(f)
-    except Exception as e:
-        print(f"❌ Error reading config: {e}")
-        return
-    
+
+async def run_series(config):
+    """Process one series config (Telegram must already be connected); returns (successful, total)"""
     series_name = config.get("series_name", "").strip()
     series_name_arabic = config.get("series_name_arabic", "").strip()
     season_num = int(config.get("season_num", 1))
@@ -878,15 +1196,28 @@ async def main():
     
     if not series_name or not series_name_arabic:
         print("❌ Invalid series configuration")
-        return
+        return 0, 0
     
     if start_ep > end_ep:
         print("❌ Start episode must be less than end episode")
-        return
+        return 0, 0
+    
+    # Per-job state: a warm daemon must not reuse last job's listings (new
+    # episodes appear) or breaker trips; latency and host windows stay warm
+    SEASON_INDEX.clear()
+    domain_breaker.reset()
     
-    # Create working directory
-    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-    download_dir = f"downloads_{timestamp}"
+    # Crawl the season listing once so every episode resolves from one map
+    global SEASON_INDEX_URL, OUTPUT_LADDER
+    SEASON_INDEX_URL = config.get("index_url") or None
+    OUTPUT_LADDER = parse_output_ladder(config.get("output_ladder"), TELEGRAM_CHANNEL)
+    if OUTPUT_LADDER:
+        heights = ', '.join(f"{r['height']}p" for r in OUTPUT_LADDER)
+        print(f"🪜 Output ladder: {heights}")
+    build_season_index(series_name, season_num, range(start_ep, end_ep + 1))
+    
+    # Working directory is persistent: failed episodes keep their checkpoints
+    download_dir = CHECKPOINT_DIR
     os.makedirs(download_dir, exist_ok=True)
     
     print(f"\n{'='*50}")
@@ -899,39 +1230,138 @@ async def main():
     print(f"📁 Working dir: {download_dir}")
     print(f"⏰ Started: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     
-    # Process episodes
-    successful = 0
-    failed = []
-    total = end_ep - start_ep + 1
+    # Process episodes (this runner's shard, claimed one at a time when CLAIM_DB is shared)
+    episodes = shard_items(range(start_ep, end_ep + 1))
+    claim_table = ClaimTable() if CLAIM_DB else None
+    claim_job = f"{series_name}_s{season_num:02d}"
     
-    for episode_num in range(start_ep, end_ep + 1):
-        current = episode_num - start_ep + 1
-        
-        print(f"\n[Episode {current}/{total}] Processing episode {episode_num:02d}")
+    # Resolve direct URLs for upcoming episodes in the background
+    prefetch_ahead = int(config.get("prefetch_ahead", PREFETCH_AHEAD))
+    if claim_table:
+        # The next episodes usually belong to other workers - resolving them
+        # here would multiply the scraping load by the number of workers
+        prefetch_ahead = 0
+    prefetcher = UrlPrefetcher(
+        lambda ep: extract_video_url_advanced(ep, series_name, season_num),
+        episodes,
+        ahead=prefetch_ahead
+    )
+    if prefetch_ahead:
+        print(f"⚡ Prefetching URLs {prefetch_ahead} episode(s) ahead")
+    else:
+        print("⚡ URL prefetch off (episodes are claimed one at a time)" if claim_table else "⚡ URL prefetch off")
+    if SHARD_COUNT > 1:
+        print(f"🧩 Shard {SHARD_INDEX + 1}/{SHARD_COUNT}: episodes {episodes}")
+    if claim_table:
+        print(f"🔒 Claiming episodes from {CLAIM_DB} as worker {WORKER_ID}")
+    
+    results = {}
+    total = len(episodes)
+    remaining = list(episodes)
+    claimed = 0
+    
+    while True:
+        if claim_table:
+            episode_num = await asyncio.to_thread(claim_table.claim, claim_job, episodes)
+            if episode_num is None:
+                # Nothing claimable now - wait while other workers hold leases that may expire
+                expiry = await asyncio.to_thread(claim_table.next_lease_expiry, claim_job, episodes)
+                if expiry is None:
+                    break
+                wait_time = min(max(expiry - time.time(), 1), CLAIM_POLL_SECONDS)
+                print(f"⏳ Other workers hold leases, checking again in {wait_time:.0f}s...")
+                await asyncio.sleep(wait_time)
+                continue
+        elif remaining:
+            episode_num = remaining[0]
+        else:
+            break
+        if episode_num in remaining:
+            remaining.remove(episode_num)
+        claimed += 1
+        current = f"{claimed}" if claim_table else f"{claimed}/{total}"
+        
+        if not claim_table:
+            metrics.set_waiting(len(remaining))
+        print(f"\n[Episode {current}] Processing episode {episode_num:02d}")
         print("─" * 50)
         
         start_time = time.time()
+        lease = asyncio.create_task(claim_table.hold(claim_job, episode_num)) if claim_table else None
         
-        success, message = await process_episode(
-            episode_num, series_name, series_name_arabic, season_num, download_dir
-        )
+        try:
+            success, message = await process_episode(
+                episode_num, series_name, series_name_arabic, season_num, download_dir, prefetcher
+            )
+        finally:
+            if lease:
+                lease.cancel()
         
         elapsed = time.time() - start_time
+        # Failures are counted once they are final (after the retry pass)
+        if success:
+            metrics.item_finished(True)
+        if claim_table:
+            await asyncio.to_thread(claim_table.complete, claim_job, episode_num, success, message)
         
+        # Last outcome wins: a claimed episode can come back for another attempt
+        results[episode_num] = success
         if success:
-            successful += 1
             print(f"✅ Episode {episode_num:02d}: {message}")
             print(f"   ⏱️ Processing time: {elapsed:.1f} seconds")
         else:
-            failed.append(episode_num)
             print(f"❌ Episode {episode_num:02d}: {message}")
         
         # Wait between episodes (to avoid rate limits)
-        if episode_num < end_ep:
+        if remaining or claim_table:
             wait_time = 3
             print(f"⏳ Waiting {wait_time} seconds before next episode...")
             await asyncio.sleep(wait_time)
     
+    successful = sum(1 for ok in results.values() if ok)
+    failed = [ep for ep, ok in results.items() if not ok]
+    if claim_table:
+        # Episodes other workers handled aren't ours to count or retry
+        total = len(results)
+        print(f"🔒 Claim table: {claim_table.summary(claim_job)}")
+    
+    prefetcher.cancel()
+    
+    # Retry failed episodes - each resumes at the stage that didn't finish
+    for attempt in range(1, EPISODE_RETRIES + 1):
+        if not failed:
+            break
+        print(f"\n🔁 Retry {attempt}/{EPISODE_RETRIES} for episodes: {failed}")
+        still_failed = []
+        for episode_num in failed:
+            if claim_table and await asyncio.to_thread(claim_table.claim, claim_job, [episode_num]) is None:
+                # Out of attempts, or another worker is on it
+                still_failed.append(episode_num)
+                continue
+            # Keep the new lease alive like the main loop does, or another worker takes the episode over
+            lease = asyncio.create_task(claim_table.hold(claim_job, episode_num)) if claim_table else None
+            try:
+                success, message = await process_episode(
+                    episode_num, series_name, series_name_arabic, season_num, download_dir
+                )
+            finally:
+                if lease:
+                    lease.cancel()
+            if success:
+                metrics.item_finished(True)
+            if claim_table:
+                await asyncio.to_thread(claim_table.complete, claim_job, episode_num, success, message)
+            if success:
+                successful += 1
+                print(f"✅ Episode {episode_num:02d}: {message}")
+            else:
+                still_failed.append(episode_num)
+                print(f"❌ Episode {episode_num:02d}: {message}")
+        failed = still_failed
+    
+    for episode_num in failed:
+        metrics.item_finished(False)
+    
     # Results summary
     print(f"\n{'='*50}")
     print("📊 Processing Summary")
@@ -950,25 +1380,126 @@ async def main():
         print(f"📝 Failed episodes: {failed}")
         print("💡 You can rerun the workflow for failed episodes only")
     
-    # Cleanup empty directory
+    domain_breaker.print_summary()
+    for line in mirror_latency.describe():
+        print(f"🌐 Mirror {line}")
+    for line in host_limiter.describe():
+        print(f"🚦 Host {line}")
+    
+    # Episode dirs are removed as they finish; failed ones stay for the next run
     try:
-        if os.path.exists(download_dir) and not os.listdir(download_dir):
-            os.rmdir(download_dir)
-            print(f"🗑️ Cleaned empty directory: {download_dir}")
-    except:
-        pass
+        os.rmdir(download_dir)
+        print(f"🗑️ Cleaned working directory: {download_dir}")
+    except OSError:
+        print(f"♻️ Kept checkpoints of failed episodes in: {download_dir}")
     
     print(f"\n{'='*50}")
     print("🏁 Processing Complete")
     print(f"⏰ Finished: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     print('='*50)
     
+    return successful, total
+
+async def main():
+    """Main function"""
+    print("="*50)
+    print("🎬 GitHub Video Processor v4.0 (Advanced Extraction)")
+    print("="*50)
+    
+    metrics.start_server()
+    
+    check_dependencies()
+    
+    # Setup Telegram
+    print("\n" + "="*50)
+    if not await setup_telegram():
+        print("❌ Cannot continue without Telegram connection")
+        return
+    
+    # Load configuration
+    config_file = "series_config.json"
+    if not os.path.exists(config_file):
+        print(f"❌ Config file not found: {config_file}")
+        print("💡 Creating sample config...")
+        
+        sample_config = {
+            "series_name": "kiralik-ask",
+            "series_name_arabic": "كيراليك اسك",
+            "season_num": 1,
+            "start_episode": 1,
+            "end_episode": 10
+        }
+        
+        with open(config_file, 'w', encoding='utf-8') as f:
+            json.dump(sample_config, f, ensure_ascii=False, indent=2)
+        
+        print(f"✅ Created {config_file} with sample data")
+        print("⚠️ Please edit the config file and run again")
+        return
+    
+    try:
+        with open(config_file, 'r', encoding='utf-8') as f:
+            config = json.load(f)
+    except Exception as e:
+        print(f"❌ Error reading config: {e}")
+        return
+    
+    await run_series(config)
+    
+    close_driver()
+    
     # Close Telegram connection
     if app:
         await app.stop()
         print("🔌 Telegram connection closed")
 
-if __name__ == "__main__":
+async def resolve_only(argv):
+    """Dry run: resolve an episode range concurrently and print a benchmark table"""
+    parser = argparse.ArgumentParser(description="Resolve episode URLs only (no download/encode/upload)")
+    parser.add_argument("--resolve-only", action="store_true")
+    parser.add_argument("episodes", nargs="+", help="episode numbers/ranges, e.g. 1-10 12")
+    parser.add_argument("--series", help="series name (default: series_config.json)")
+    parser.add_argument("--season", type=int, help="season number (default: series_config.json)")
+    parser.add_argument("--concurrency", type=int, default=4)
+    args = parser.parse_args(argv)
+    
+    config = {}
+    if os.path.exists("series_config.json"):
+        with open("series_config.json", 'r', encoding='utf-8') as f:
+            config = json.load(f)
+    series_name = args.series or config.get("series_name", "").strip()
+    season_num = args.season or int(config.get("season_num", 1))
+    episodes = [e for e in parse_items(args.episodes) if isinstance(e, int)]
+    if not series_name or not episodes:
+        print("❌ Need a series name and at least one episode")
+        return
+    
+    global SEASON_INDEX_URL
+    SEASON_INDEX_URL = config.get("index_url") or None
+    
+    print(f"🔍 Resolve-only: {series_name} S{season_num:02d}, {len(episodes)} episode(s), "
+          f"concurrency {args.concurrency}")
+    
+    # Crawl the shared season index up front so the episode threads don't race to build it
+    start = time.time()
+    build_season_index(series_name, season_num, episodes)
+    print(f"📚 Season index ready in {time.time() - start:.1f}s")
+    
+    rows, wall = await resolve_all(
+        episodes, lambda ep: extract_video_url_advanced(ep, series_name, season_num), args.concurrency
+    )
+    print_table(rows, wall)
+    
+    domain_breaker.print_summary()
+    for line in mirror_latency.describe():
+        print(f"🌐 Mirror {line}")
+    for line in host_limiter.describe():
+        print(f"🚦 Host {line}")
+    close_driver()
+
+if __name__ == "__main__" and RESOLVE_ONLY:
+    asyncio.run(resolve_only(sys.argv[1:]))
+elif __name__ == "__main__":
     try:
         asyncio.run(main())
     except KeyboardInterrupt:
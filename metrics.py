@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Live metrics - optional Prometheus-format endpoint during runs
+Enable with METRICS_PORT (e.g. METRICS_PORT=9108, then GET /metrics)
+"""
+
+import os
+import time
+import threading
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+METRICS_PORT = int(os.environ.get("METRICS_PORT", "0") or 0)
+PREFIX = "v240p_"
+
+HELP = {
+    "download_bytes_per_second": ("gauge", "Current download throughput"),
+    "download_bytes_total": ("counter", "Bytes downloaded"),
+    "upload_bytes_per_second": ("gauge", "Current upload throughput"),
+    "upload_bytes_total": ("counter", "Bytes uploaded"),
+    "encode_fps": ("gauge", "Current ffmpeg encode frames per second"),
+    "encode_speed_ratio": ("gauge", "Current ffmpeg encode speed (media seconds per wall second)"),
+    "encode_frames_total": ("counter", "Frames encoded"),
+    "queue_depth": ("gauge", "Items waiting or in progress per stage"),
+    "items_total": ("counter", "Items finished by result"),
+    "last_progress_timestamp_seconds": ("gauge", "Unix time of the last progress update per stage"),
+}
+
+lock = threading.Lock()
+values = {}
+server = None
+
+
+def _key(name, labels):
+    return name, tuple(sorted(labels.items()))
+
+
+def set_gauge(name, value, **labels):
+    with lock:
+        values[_key(name, labels)] = value
+
+
+def inc(name, value=1, **labels):
+    with lock:
+        key = _key(name, labels)
+        values[key] = values.get(key, 0) + value
+
+
+def add_gauge(name, delta, **labels):
+    inc(name, delta, **labels)
+
+
+def render():
+    """Render all metrics in Prometheus text format"""
+    with lock:
+        items = sorted(values.items())
+    lines = []
+    seen = set()
+    for (name, labels), value in items:
+        if name not in seen:
+            seen.add(name)
+            kind, text = HELP.get(name, ("gauge", name))
+            lines.append(f"# HELP {PREFIX}{name} {text}")
+            lines.append(f"# TYPE {PREFIX}{name} {kind}")
+        label_text = ",".join(f'{k}="{v}"' for k, v in labels)
+        label_text = "{" + label_text + "}" if label_text else ""
+        lines.append(f"{PREFIX}{name}{label_text} {value}")
+    return "\n".join(lines) + "\n"
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split('?')[0] not in ("/metrics", "/"):
+            self.send_response(404)
+            self.end_headers()
+            return
+        body = render().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_server(port=METRICS_PORT):
+    """Serve /metrics on localhost in a daemon thread (no-op when port is 0)"""
+    global server
+    if not port or server:
+        return None
+    try:
+        server = ThreadingHTTPServer(("127.0.0.1", port), MetricsHandler)
+    except OSError as e:
+        print(f"⚠️ Cannot start metrics server on port {port}: {e}")
+        return None
+    threading.Thread(target=server.serve_forever, daemon=True, name="metrics").start()
+    print(f"📈 Metrics: http://127.0.0.1:{port}/metrics")
+    return server
+
+
+# ===== HELPERS FOR PROGRESS CALLBACKS =====
+
+def progress_tracker(direction):
+    """Callback(bytes_so_far) for 'download'/'upload' progress that updates throughput metrics"""
+    state = {'start': time.time(), 'last': 0}
+
+    def update(current):
+        delta = current - state['last']
+        if delta < 0:  # transfer restarted
+            delta = current
+            state['start'] = time.time()
+        state['last'] = current
+        elapsed = time.time() - state['start']
+        inc(f"{direction}_bytes_total", delta)
+        if elapsed > 0:
+            set_gauge(f"{direction}_bytes_per_second", round(current / elapsed))
+        set_gauge("last_progress_timestamp_seconds", round(time.time()), stage=direction)
+
+    return update
+
+
+def ytdlp_progress_hook():
+    """yt-dlp progress_hooks entry feeding the download metrics"""
+    update = progress_tracker("download")
+
+    def hook(d):
+        if d.get('status') == 'downloading':
+            update(d.get('downloaded_bytes') or 0)
+            if d.get('speed'):
+                set_gauge("download_bytes_per_second", round(d['speed']))
+        elif d.get('status') == 'finished':
+            set_gauge("download_bytes_per_second", 0)
+
+    return hook
+
+
+def encode_progress_tracker():
+    """Callback(progress) for one encode's parsed ffmpeg -progress output (fps, speed, frame)
+
+    One tracker per encode: concurrent encodes each count their own frames.
+    """
+    state = {'last_frame': 0}
+
+    def update(progress):
+        try:
+            fps = float(progress.get('fps', 0) or 0)
+            set_gauge("encode_fps", fps)
+            speed = str(progress.get('speed', '0')).rstrip('x').strip()
+            set_gauge("encode_speed_ratio", float(speed) if speed not in ('', 'N/A') else 0)
+            frame = int(progress.get('frame', 0) or 0)
+            if frame >= state['last_frame']:
+                inc("encode_frames_total", frame - state['last_frame'])
+            state['last_frame'] = frame
+            set_gauge("last_progress_timestamp_seconds", round(time.time()), stage="encode")
+        except (ValueError, TypeError):
+            pass
+
+    return update
+
+
+@contextmanager
+def stage(name):
+    """Count an item as in progress in a stage while the block runs"""
+    add_gauge("queue_depth", 1, stage=name, state="active")
+    try:
+        yield
+    finally:
+        add_gauge("queue_depth", -1, stage=name, state="active")
+
+
+def set_waiting(count):
+    set_gauge("queue_depth", count, stage="pending", state="waiting")
+
+
+def item_finished(success):
+    inc("items_total", 1, result="done" if success else "failed")
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Resolve-ahead prefetcher - resolves direct media URLs for upcoming items
+in background threads while the current item downloads/encodes/uploads
+Signed CDN URLs are re-resolved only if they expired before use
+"""
+
+import time
+import asyncio
+from urllib.parse import urlparse, parse_qs
+
+# Re-resolve when less than this many seconds of validity are left
+EXPIRY_MARGIN = 60
+
+# Query parameters CDNs use for absolute expiry timestamps
+EXPIRY_PARAMS = ('expires', 'expire', 'exp', 'e', 'Expires', 'validto', 'valid_to')
+
+
+def parse_url_expiry(url, resolved_at=None):
+    """Return the unix time a signed URL expires, or None if unsigned"""
+    if not url:
+        return None
+    try:
+        query = parse_qs(urlparse(url).query)
+    except:
+        return None
+
+    for param in EXPIRY_PARAMS:
+        values = query.get(param)
+        if values and values[0].isdigit():
+            value = int(values[0])
+            # Millisecond timestamps
+            if value > 10**12:
+                value //= 1000
+            if value > 10**9:
+                return value
+
+    # AWS-style relative expiry
+    if 'X-Amz-Expires' in query and query['X-Amz-Expires'][0].isdigit():
+        return (resolved_at or time.time()) + int(query['X-Amz-Expires'][0])
+
+    return None
+
+
+class UrlPrefetcher:
+    """Resolve items `ahead` positions in advance; resolver returns (url, message)"""
+
+    def __init__(self, resolver, items, ahead=2):
+        self.resolver = resolver
+        self.items = list(items)
+        self.ahead = max(0, ahead)
+        self.futures = {}
+
+    def _submit(self, item):
+        if item in self.futures:
+            return
+        loop = asyncio.get_running_loop()
+        # run_in_executor starts the thread immediately, even if the loop is busy
+        self.futures[item] = loop.run_in_executor(None, self._resolve, item)
+
+    def _resolve(self, item):
+        resolved_at = time.time()
+        url, message = self.resolver(item)
+        return {
+            'url': url,
+            'message': message,
+            'resolved_at': resolved_at,
+            'expires_at': parse_url_expiry(url, resolved_at),
+        }
+
+    def schedule(self, current):
+        """Start resolving the items after `current`"""
+        if current not in self.items:
+            return
+        position = self.items.index(current)
+        for item in self.items[position + 1:position + 1 + self.ahead]:
+            self._submit(item)
+
+    async def get(self, item):
+        """Resolved (url, message) for an item, re-resolving if its URL has expired"""
+        self._submit(item)
+        self.schedule(item)
+        result = await self.futures.pop(item)
+
+        if result['url'] and result['expires_at']:
+            remaining = result['expires_at'] - time.time()
+            if remaining < EXPIRY_MARGIN:
+                print(f"⌛ Prefetched URL expired ({remaining:.0f}s left), re-resolving...")
+                result = await asyncio.get_running_loop().run_in_executor(None, self._resolve, item)
+            else:
+                print(f"⚡ Using prefetched URL (valid for {remaining / 60:.0f} more min)")
+        elif result['url']:
+            waited = time.time() - result['resolved_at']
+            print(f"⚡ Using prefetched URL (resolved {waited:.0f}s ago)")
+
+        return result['url'], result['message']
+
+    def cancel(self):
+        for future in self.futures.values():
+            future.cancel()
+        self.futures.clear()
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Preflight - predict whether a full 240p transcode is worth it
+Encodes a short sample, extrapolates final size and encode time, and picks
+one of: transcode, remux (stream copy into mp4) or passthrough (use as-is)
+"""
+
+import os
+import json
+import time
+import shutil
+import subprocess
+from datetime import datetime
+
+from workfiles import make_temp_dir
+from ffmpeg_progress import run_ffmpeg
+from encoding_profiles import load_profile, build_encode_args, cut_sample, probe_duration
+
+PREFLIGHT_ENABLED = os.environ.get("PREFLIGHT", "1") != "0"
+PREFLIGHT_LOG = os.environ.get("PREFLIGHT_LOG", "preflight_log.jsonl")
+SAMPLE_SECONDS = 25
+# Skip the transcode when it is predicted to save less than this fraction
+MIN_SAVING = float(os.environ.get("PREFLIGHT_MIN_SAVING", "0.2"))
+
+# Codecs that can go into an mp4 container without re-encoding
+MP4_VIDEO_CODECS = {"h264", "hevc", "mpeg4"}
+MP4_AUDIO_CODECS = {"aac", "mp3", "ac3", "eac3"}
+
+ACTION_TRANSCODE = "transcode"
+ACTION_REMUX = "remux"
+ACTION_PASSTHROUGH = "passthrough"
+
+
+def probe_media(input_file):
+    """Probe container and stream info with a single ffprobe call"""
+    try:
+        cmd = ['ffprobe', '-v', 'error', '-print_format', 'json',
+               '-show_format', '-show_streams', input_file]
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=60)
+        if result.returncode != 0:
+            return None
+        data = json.loads(result.stdout)
+    except:
+        return None
+
+    info = {
+        "format_name": data.get("format", {}).get("format_name", ""),
+        "duration": float(data.get("format", {}).get("duration", 0) or 0),
+        "size_mb": os.path.getsize(input_file) / (1024 * 1024),
+        "video_codec": None,
+        "audio_codec": None,
+        "height": 0,
+    }
+    for stream in data.get("streams", []):
+        if stream.get("codec_type") == "video" and not info["video_codec"]:
+            info["video_codec"] = stream.get("codec_name")
+            info["height"] = int(stream.get("height") or 0)
+        elif stream.get("codec_type") == "audio" and not info["audio_codec"]:
+            info["audio_codec"] = stream.get("codec_name")
+    return info
+
+
+def probe_height(input_file):
+    """Height of the first video stream (plain ffprobe, for when the full probe fails)"""
+    try:
+        cmd = ['ffprobe', '-v', 'error', '-select_streams', 'v:0',
+               '-show_entries', 'stream=height', '-of', 'csv=p=0:nk=1', input_file]
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=60)
+        height = result.stdout.strip()
+        if result.returncode == 0 and height.isdigit():
+            return int(height)
+    except:
+        pass
+    return 0
+
+
+def is_mp4_compatible(info):
+    """Check if streams can be stream-copied into mp4"""
+    if info["video_codec"] not in MP4_VIDEO_CODECS:
+        return False
+    return info["audio_codec"] is None or info["audio_codec"] in MP4_AUDIO_CODECS
+
+
+def copy_action(info):
+    """Cheapest action that yields a valid mp4 without re-encoding"""
+    if 'mp4' in info["format_name"] or 'mov' in info["format_name"]:
+        return ACTION_PASSTHROUGH
+    return ACTION_REMUX
+
+
+def plan_compression(input_file, profile=None, sample_seconds=SAMPLE_SECONDS):
+    """Decide between transcode, remux and passthrough from a sample encode"""
+    plan = {
+        "file": os.path.basename(input_file),
+        "action": ACTION_TRANSCODE,
+        "reason": "default",
+        "predicted_size_mb": None,
+        "predicted_seconds": None,
+    }
+
+    # The <=240p copy check runs even with preflight off - only the sample encode is optional
+    info = probe_media(input_file)
+    if not info or not info["video_codec"]:
+        height = probe_height(input_file)
+        if height and height <= 240:
+            plan["action"] = ACTION_PASSTHROUGH
+            plan["reason"] = f"already {height}p"
+        else:
+            plan["reason"] = "probe failed"
+        return plan
+
+    plan["source_size_mb"] = round(info["size_mb"], 2)
+    plan["duration"] = info["duration"]
+    compatible = is_mp4_compatible(info)
+
+    if info["height"] and info["height"] <= 240 and compatible:
+        plan["action"] = copy_action(info)
+        plan["reason"] = f"already {info['height']}p"
+        return plan
+
+    if not PREFLIGHT_ENABLED:
+        plan["reason"] = "preflight disabled"
+        return plan
+
+    # Too short to be worth sampling - just transcode
+    if info["duration"] < sample_seconds * 3:
+        plan["reason"] = "short video"
+        return plan
+
+    profile = profile or load_profile()
+    # Sample clips are small - stage them on tmpfs when it fits
+    sample_bytes = info["size_mb"] * 1024 * 1024 * sample_seconds * 2 / info["duration"]
+    work_dir = make_temp_dir("preflight_", sample_bytes)
+    try:
+        sample_file = os.path.join(work_dir, "sample.mp4")
+        sample_out = os.path.join(work_dir, "sample_240p.mp4")
+        start = int(info["duration"] * 0.3)
+
+        if not cut_sample(input_file, sample_file, start, sample_seconds):
+            plan["reason"] = "sample cut failed"
+            return plan
+
+        sample_duration = probe_duration(sample_file) or float(sample_seconds)
+
+        cmd = ['ffmpeg', '-i', sample_file, '-vf', 'scale=-2:240']
+        cmd += build_encode_args(profile)
+        cmd += ['-y', sample_out]
+
+        t0 = time.time()
+        result = run_ffmpeg(cmd, timeout=300)
+        sample_elapsed = time.time() - t0
+
+        if result.returncode != 0 or not os.path.exists(sample_out):
+            plan["reason"] = "sample encode failed"
+            return plan
+
+        scale = info["duration"] / sample_duration
+        predicted_size = os.path.getsize(sample_out) / (1024 * 1024) * scale
+        plan["predicted_size_mb"] = round(predicted_size, 2)
+        plan["predicted_seconds"] = round(sample_elapsed * scale, 1)
+
+        saving = 1 - predicted_size / info["size_mb"] if info["size_mb"] > 0 else 0
+        plan["predicted_saving"] = round(saving, 3)
+
+        if saving < MIN_SAVING and compatible:
+            plan["action"] = copy_action(info)
+            plan["reason"] = f"predicted saving {saving * 100:.0f}% < {MIN_SAVING * 100:.0f}%"
+        else:
+            plan["reason"] = f"predicted saving {saving * 100:.0f}%"
+        return plan
+
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def print_plan(plan):
+    """Print a preflight decision"""
+    print(f"🔮 Preflight: {plan['action']} ({plan['reason']})")
+    if plan["predicted_size_mb"] is not None:
+        print(f"   Predicted: {plan['predicted_size_mb']:.1f} MB in ~{plan['predicted_seconds']:.0f}s")
+
+
+def remux_to_mp4(input_file, output_file):
+    """Stream-copy into an mp4 container"""
+    cmd = [
+        'ffmpeg',
+        '-i', input_file,
+        '-c', 'copy',
+        '-movflags', '+faststart',
+        '-y',
+        output_file
+    ]
+    try:
+        result = run_ffmpeg(cmd, timeout=600)
+        return result.returncode == 0 and os.path.exists(output_file)
+    except Exception as e:
+        print(f"❌ Remux error: {e}")
+        return False
+
+
+def log_outcome(plan, output_file, elapsed):
+    """Log prediction next to the actual result"""
+    actual_size = os.path.getsize(output_file) / (1024 * 1024) if os.path.exists(output_file) else 0
+    record = dict(plan)
+    record["actual_size_mb"] = round(actual_size, 2)
+    record["actual_seconds"] = round(elapsed, 1)
+    record["time"] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
+    if plan["predicted_size_mb"] is not None and plan["action"] == ACTION_TRANSCODE:
+        print(f"📐 Prediction vs actual: {plan['predicted_size_mb']:.1f} → {actual_size:.1f} MB, "
+              f"{plan['predicted_seconds']:.0f} → {elapsed:.0f}s")
+
+    try:
+        with open(PREFLIGHT_LOG, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    except:
+        pass
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Resolve-only dry run - run URL extraction alone (no download, encode or
+upload), concurrently, and print per item: resolved URL, winning strategy,
+latency and number of requests made
+Used by `main.py --resolve-only 1-10` and `video.py --resolve-only URL...`
+"""
+
+import time
+import asyncio
+import threading
+import contextvars
+
+DEFAULT_CONCURRENCY = 4
+
+# Per-item trace; copied into to_thread workers (and hedge threads) with the context
+current_trace = contextvars.ContextVar("resolve_trace", default=None)
+
+
+def count_request(count=1):
+    """Count HTTP requests/page loads made for the item being resolved"""
+    trace = current_trace.get()
+    if trace is not None:
+        with trace['lock']:
+            trace['requests'] += count
+
+
+def note_strategy(name):
+    """Record which strategy produced the URL"""
+    trace = current_trace.get()
+    if trace is not None:
+        trace['strategy'] = name
+
+
+def parse_items(values):
+    """'1-10', '12', '3,5' -> episode numbers; anything else is kept as a URL"""
+    items = []
+    for value in values:
+        for part in value.split(','):
+            part = part.strip()
+            if not part:
+                continue
+            first, dash, last = part.partition('-')
+            if first.isdigit() and (not dash or last.isdigit()):
+                items.extend(range(int(first), int(last or first) + 1))
+            else:
+                items.append(part)
+    return items
+
+
+def resolve_traced(resolver, item):
+    """Resolve one item with a fresh trace; returns a result row"""
+    trace = {'requests': 0, 'strategy': None, 'lock': threading.Lock()}
+    current_trace.set(trace)
+
+    start = time.time()
+    try:
+        result = resolver(item)
+        error = None
+    except Exception as e:
+        result, error = None, f"{type(e).__name__}: {e}"
+    elapsed = time.time() - start
+
+    # Resolvers return either a URL or (url, message)
+    url = result[0] if isinstance(result, tuple) else result
+    return {
+        'item': item,
+        'url': url,
+        'strategy': trace['strategy'] if url else None,
+        'seconds': elapsed,
+        'requests': trace['requests'],
+        'error': error,
+    }
+
+
+async def resolve_all(items, resolver, concurrency=DEFAULT_CONCURRENCY):
+    """Resolve items concurrently (at most `concurrency` at a time), in input order"""
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def run(item):
+        async with semaphore:
+            # to_thread runs in a copy of this context, so each item gets its own trace
+            return await asyncio.to_thread(resolve_traced, resolver, item)
+
+    start = time.time()
+    rows = await asyncio.gather(*[run(item) for item in items])
+    return rows, time.time() - start
+
+
+def print_table(rows, wall_seconds):
+    """Print the per-item table and totals"""
+    print(f"\n{'='*100}")
+    print(f"{'ITEM':<14} {'STRATEGY':<16} {'TIME':>8} {'REQS':>5}  URL")
+    print('-' * 100)
+    for row in rows:
+        item = str(row['item'])
+        item = item if len(item) <= 14 else "…" + item[-13:]
+        url = row['url'] or f"❌ {row['error'] or 'not resolved'}"
+        print(f"{item:<14} {row['strategy'] or '-':<16} {row['seconds']:>7.1f}s {row['requests']:>5}  {url[:80]}")
+    print('=' * 100)
+
+    resolved = [r for r in rows if r['url']]
+    busy = sum(r['seconds'] for r in rows)
+    print(f"✅ Resolved: {len(resolved)}/{len(rows)}")
+    print(f"🌐 Requests: {sum(r['requests'] for r in rows)}")
+    print(f"⏱️ Wall time: {wall_seconds:.1f}s (sum of item times: {busy:.1f}s)")
+    if wall_seconds > 0:
+        print(f"⚡ Throughput: {len(rows) / wall_seconds * 60:.1f} items/min")
+
+    strategies = {}
+    for row in resolved:
+        strategies[row['strategy'] or '-'] = strategies.get(row['strategy'] or '-', 0) + 1
+    if strategies:
+        print(f"🏆 Winners: {', '.join(f'{name}={count}' for name, count in strategies.items())}")
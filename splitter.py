@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Splitter - cut files over Telegram's size limit into playable parts
+Stream copy only (no re-encode): the segment muxer cuts at keyframes, so
+every part starts on a keyframe and plays on its own
+"""
+
+import os
+import glob
+import asyncio
+
+from ffmpeg_progress import run_ffmpeg
+from encoding_profiles import probe_duration
+
+# Telegram rejects files over 2000 MB - keep some headroom for container overhead
+MAX_PART_MB = int(os.environ.get("MAX_PART_MB", "1950"))
+# Parts can overshoot the target by up to one GOP, so aim a bit lower
+TARGET_FILL = 0.92
+MAX_ATTEMPTS = 3
+
+
+def needs_split(file_path, max_mb=MAX_PART_MB):
+    return os.path.getsize(file_path) > max_mb * 1024 * 1024
+
+
+def split_at_keyframes(input_file, output_dir, max_mb=MAX_PART_MB):
+    """Split into numbered mp4 parts no bigger than max_mb; returns the part paths (or [] on failure)"""
+    size = os.path.getsize(input_file)
+    duration = probe_duration(input_file)
+    if duration <= 0:
+        print("❌ Cannot split: unknown duration")
+        return []
+
+    max_bytes = max_mb * 1024 * 1024
+    base = os.path.splitext(os.path.basename(input_file))[0]
+    pattern = os.path.join(output_dir, f"{base}_part%03d.mp4")
+    segment_seconds = duration * max_bytes * TARGET_FILL / size
+
+    for attempt in range(1, MAX_ATTEMPTS + 1):
+        for old in glob.glob(os.path.join(output_dir, f"{base}_part*.mp4")):
+            os.remove(old)
+
+        print(f"✂️ Splitting {size / (1024 * 1024):.0f} MB into ~{segment_seconds / 60:.1f} min parts "
+              f"(max {max_mb} MB)")
+        cmd = [
+            'ffmpeg',
+            '-i', input_file,
+            '-map', '0',
+            '-c', 'copy',
+            '-f', 'segment',
+            '-segment_time', f"{segment_seconds:.2f}",
+            '-reset_timestamps', '1',
+            '-segment_format', 'mp4',
+            '-segment_format_options', 'movflags=+faststart',
+            '-y',
+            pattern
+        ]
+        result = run_ffmpeg(cmd, timeout=1800)
+        parts = sorted(glob.glob(os.path.join(output_dir, f"{base}_part*.mp4")))
+        if result.returncode != 0 or not parts:
+            print(f"❌ Split failed")
+            if result.stderr:
+                print(f"Error: {result.stderr[-500:]}")
+            return []
+
+        largest = max(os.path.getsize(p) for p in parts)
+        if largest <= max_bytes:
+            print(f"✅ Split into {len(parts)} parts (largest {largest / (1024 * 1024):.0f} MB)")
+            return parts
+
+        # Sparse keyframes pushed a part over the limit - shrink the target and retry
+        print(f"⚠️ Part of {largest / (1024 * 1024):.0f} MB is over the limit (attempt {attempt}/{MAX_ATTEMPTS})")
+        segment_seconds *= max_bytes * TARGET_FILL / largest
+
+    return []
+
+
+async def upload_in_parts(upload, work, file_path, caption, thumbnail_path=None, chat_id=None, checkpoint=None):
+    """upload(path, caption, thumbnail_path, chat_id), split into "Part i/N" uploads when over MAX_PART_MB
+
+    Parts go up one after another so they appear in the channel in order;
+    a failed part stops the rest. With a checkpoint, every sent upload is
+    recorded and skipped on retry, so the channel gets no duplicates.
+    """
+    name = os.path.basename(file_path)
+
+    async def send(path, text, stage):
+        if checkpoint and checkpoint.get(stage):
+            print(f"⏭️ {text} already uploaded")
+            return True
+        if not await upload(path, text, thumbnail_path, chat_id):
+            return False
+        if checkpoint:
+            checkpoint.done(stage, chat_id=chat_id)
+        return True
+
+    if not needs_split(file_path):
+        return await send(file_path, caption, f"upload:{chat_id or ''}:{name}")
+
+    print(f"📦 {name} is over {MAX_PART_MB} MB, splitting...")
+    parts_dir = work.file(f"parts_{os.path.splitext(name)[0]}")
+    os.makedirs(parts_dir, exist_ok=True)
+    parts = await asyncio.to_thread(split_at_keyframes, file_path, parts_dir)
+    if not parts:
+        return False
+
+    for i, part in enumerate(parts, 1):
+        stage = f"upload:{chat_id or ''}:{name}:part{i}/{len(parts)}"
+        if not await send(part, f"{caption} - Part {i}/{len(parts)}", stage):
+            print(f"📦 Part {i}/{len(parts)} failed, not sending the rest out of order")
+            return False
+    print(f"📦 Uploaded {len(parts)} parts")
+    return True
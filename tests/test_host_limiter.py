@@ -0,0 +1,61 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import host_limiter
+from host_limiter import HostLimiter, INITIAL_LIMIT, MIN_LIMIT, MAX_LIMIT
+
+URL = "https://cdn.example/video.m3u8"
+
+
+class Response:
+    def __init__(self, status_code):
+        self.status_code = status_code
+        self.headers = {}
+        self.text = ""
+
+
+def window(limiter):
+    return limiter._state("cdn.example").limit
+
+
+def test_serial_requests_do_not_grow_the_window():
+    limiter = HostLimiter()
+    for _ in range(50):
+        limiter.get(lambda url: Response(200), URL)
+    assert window(limiter) == INITIAL_LIMIT
+
+
+def test_window_grows_when_full():
+    limiter = HostLimiter()
+    for _ in range(200):
+        limit = int(window(limiter))
+        for _ in range(limit):
+            limiter.acquire(URL)
+        for _ in range(limit):
+            limiter.record_success(URL)
+            limiter.release(URL)
+    assert window(limiter) == MAX_LIMIT
+
+
+def test_throttle_halves_the_window(monkeypatch):
+    limiter = HostLimiter()
+    limiter.acquire(URL)
+    limiter.acquire(URL)
+    limiter.record_success(URL)
+    grown = window(limiter)
+    assert grown > INITIAL_LIMIT
+
+    limiter.record(URL, Response(429), 0.1)
+    assert window(limiter) == max(MIN_LIMIT, grown * host_limiter.DECREASE_FACTOR)
+
+    # A second throttle from the same burst doesn't back off again
+    limiter.record(URL, Response(503), 0.1)
+    assert window(limiter) == max(MIN_LIMIT, grown * host_limiter.DECREASE_FACTOR)
+
+    # Later, it does - down to the floor
+    for _ in range(10):
+        monkeypatch.setattr(limiter._state("cdn.example"), "last_decrease", 0.0)
+        limiter.record_throttle(URL, "HTTP 429")
+    assert window(limiter) == MIN_LIMIT
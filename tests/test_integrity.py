@@ -0,0 +1,35 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from integrity import check_download
+
+
+def write(tmp_path, name, data):
+    path = tmp_path / name
+    path.write_bytes(data)
+    return str(path)
+
+
+def test_playlist_saved_as_video_is_rejected(tmp_path):
+    lines = ["#EXTM3U", "#EXT-X-TARGETDURATION:10"]
+    for i in range(120):
+        lines += ["#EXTINF:5.0,", f"https://cdn.example/seg-{i:04d}.ts?token=abcdef"]
+    path = write(tmp_path, "temp_video.mp4", "\n".join(lines).encode())
+    assert os.path.getsize(path) > 3000
+
+    report = check_download(path, expected_duration=600)
+    assert not report['ok']
+    assert report['container'] == "text"
+
+
+def test_html_error_page_is_rejected(tmp_path):
+    body = "<!DOCTYPE html><html><head><title>Access denied</title></head><body>"
+    body += "<p>You don't have permission to access this resource.</p>" * 45 + "</body></html>"
+    path = write(tmp_path, "temp_video.mp4", body.encode())
+    assert os.path.getsize(path) > 2000
+
+    report = check_download(path, expected_duration=600)
+    assert not report['ok']
+    assert report['container'] == "text"
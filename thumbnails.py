@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Thumbnails - keyframe-only seeking with a cheap luma check
+Samples a few keyframes across the video and keeps the first one that
+isn't black or flat (intros, fades, title cards)
+"""
+
+import os
+import subprocess
+
+from encoding_profiles import probe_duration
+
+# Fractions of the duration to sample, in order of preference
+CANDIDATE_POSITIONS = [0.1, 0.2, 0.35, 0.5, 0.65]
+FALLBACK_SECONDS = 5
+
+# Luma check on a tiny grayscale copy of the frame
+PROBE_WIDTH, PROBE_HEIGHT = 32, 18
+MIN_MEAN_LUMA = 24     # darker = black frame
+MAX_MEAN_LUMA = 235    # brighter = white flash
+MIN_LUMA_STDDEV = 12   # lower = flat card / fade
+
+
+def luma_stats(raw):
+    """Mean and standard deviation of 8-bit gray pixels"""
+    if not raw:
+        return 0.0, 0.0
+    count = len(raw)
+    mean = sum(raw) / count
+    variance = sum((p - mean) ** 2 for p in raw) / count
+    return mean, variance ** 0.5
+
+
+def is_usable_frame(mean, stddev):
+    return MIN_MEAN_LUMA <= mean <= MAX_MEAN_LUMA and stddev >= MIN_LUMA_STDDEV
+
+
+def grab_keyframe(input_file, seconds, output_file):
+    """Decode one keyframe at/after `seconds`: write the JPEG and return its tiny gray copy
+
+    -skip_frame nokey before -i makes the decoder drop every non-keyframe,
+    and input seeking jumps straight to the nearest keyframe.
+    """
+    cmd = [
+        'ffmpeg',
+        '-v', 'error',
+        '-skip_frame', 'nokey',
+        '-noaccurate_seek',
+        '-ss', f"{seconds:.2f}",
+        '-i', input_file,
+        '-map', '0:v:0', '-frames:v', '1', '-s', '320x180', '-f', 'image2', '-y', output_file,
+        '-map', '0:v:0', '-frames:v', '1', '-vf', f'scale={PROBE_WIDTH}:{PROBE_HEIGHT},format=gray',
+        '-f', 'rawvideo', 'pipe:1',
+    ]
+    result = subprocess.run(cmd, capture_output=True, timeout=30)
+    if result.returncode != 0 or not os.path.exists(output_file):
+        return None
+    return result.stdout
+
+
+def create_thumbnail(input_file, thumbnail_path):
+    """Create thumbnail from video (first non-black, non-flat keyframe)"""
+    try:
+        print(f"🖼️ Creating thumbnail...")
+
+        duration = probe_duration(input_file)
+        if duration > 0:
+            positions = [duration * p for p in CANDIDATE_POSITIONS]
+        else:
+            positions = [FALLBACK_SECONDS]
+
+        first_candidate = None
+        for index, seconds in enumerate(positions):
+            candidate = f"{thumbnail_path}.cand{index}.jpg"
+            raw = grab_keyframe(input_file, seconds, candidate)
+            if raw is None:
+                continue
+
+            mean, stddev = luma_stats(raw)
+            if is_usable_frame(mean, stddev):
+                os.replace(candidate, thumbnail_path)
+                print(f"✅ Thumbnail from keyframe at {seconds:.0f}s (luma {mean:.0f}±{stddev:.0f}, "
+                      f"{os.path.getsize(thumbnail_path) / 1024:.1f}KB)")
+                if first_candidate:
+                    os.remove(first_candidate)
+                return True
+
+            print(f"  ⏭️ Keyframe at {seconds:.0f}s is black/flat (luma {mean:.0f}±{stddev:.0f})")
+            if first_candidate is None:
+                first_candidate = candidate
+            else:
+                os.remove(candidate)
+
+        # Nothing passed the luma check - better some thumbnail than none
+        if first_candidate:
+            os.replace(first_candidate, thumbnail_path)
+            print(f"⚠️ Using first sampled keyframe as thumbnail")
+            return True
+
+        return False
+
+    except Exception as e:
+        print(f"❌ Thumbnail error: {e}")
+        return False
@@ -11,11 +11,14 @@ import sys
 import re
 import time
 import json
+import hashlib
 import requests
 import subprocess
-import shutil
 import asyncio
+import argparse
 import threading
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from urllib.parse import urlparse, urljoin, quote
 
@@ -47,14 +50,17 @@ def validate_env():
     print("✅ Environment variables validated")
     return True
 
-if not validate_env():
+# --resolve-only exercises URL extraction alone and needs no Telegram credentials
+RESOLVE_ONLY = "--resolve-only" in sys.argv
+
+if not RESOLVE_ONLY and not validate_env():
     sys.exit(1)
 
-TELEGRAM_API_ID = int(TELEGRAM_API_ID)
+TELEGRAM_API_ID = int(TELEGRAM_API_ID) if TELEGRAM_API_ID.isdigit() else 0
 
 # Install requirements
 print("📦 Installing requirements...")
-requirements = ["pyrogram", "tgcrypto", "yt-dlp", "requests", "beautifulsoup4", "cloudscraper"]
+requirements = ["pyrogram", "tgcrypto", "yt-dlp", "requests", "cloudscraper"]
 for req in requirements:
     try:
         subprocess.check_call([sys.executable, "-m", "pip", "install", req, "--quiet"])
@@ -65,9 +71,23 @@ for req in requirements:
 from pyrogram import Client
 from pyrogram.errors import FloodWait
 import yt_dlp
-from bs4 import BeautifulSoup
 import cloudscraper
 
+from encoding_profiles import (load_profile, build_encode_args, describe_profile,
+                               parse_output_ladder, encode_ladder)
+import hls
+from workfiles import WorkDir, place_file
+from ffmpeg_progress import run_ffmpeg
+from thumbnails import create_thumbnail
+from resolve_only import count_request, note_strategy, resolve_all, print_table
+from host_limiter import HostLimiter, is_throttle_error
+from html_scan import find_first_iframe
+from integrity import download_verified, remember_digest
+from splitter import upload_in_parts
+import metrics
+from preflight import (plan_compression, print_plan, remux_to_mp4, log_outcome,
+                       ACTION_PASSTHROUGH, ACTION_REMUX)
+
 app = None
 
 # Headers for VK
@@ -82,6 +102,31 @@ HEADERS = {
     'Referer': 'https://vk.com/',
 }
 
+# ===== LINK THROUGHPUT =====
+# Measured during this run, used to estimate the cost of fetching each HLS variant
+LINK_STATS = {'bytes': 0, 'seconds': 0.0}
+LINK_STATS_LOCK = threading.Lock()
+DEFAULT_THROUGHPUT = 2 * 1024 * 1024  # bytes/s until something is measured
+MIN_MEASURED_BYTES = 256 * 1024  # smaller transfers are dominated by latency
+
+# Transcode cost model (pixels per second this runner can decode+scale)
+DECODE_PIXEL_RATE = float(os.environ.get("DECODE_PIXEL_RATE", 60e6))
+
+def record_transfer(num_bytes, seconds):
+    """Record a completed transfer for throughput estimation"""
+    if num_bytes < MIN_MEASURED_BYTES or seconds <= 0:
+        return
+    with LINK_STATS_LOCK:
+        LINK_STATS['bytes'] += num_bytes
+        LINK_STATS['seconds'] += seconds
+
+def get_link_throughput():
+    """Measured link throughput in bytes/s"""
+    with LINK_STATS_LOCK:
+        if LINK_STATS['seconds'] > 0:
+            return LINK_STATS['bytes'] / LINK_STATS['seconds']
+    return DEFAULT_THROUGHPUT
+
 async def setup_telegram():
     """Setup Telegram client"""
     global app
@@ -167,177 +212,242 @@ def fix_cdn_url(url):
     
     return url
 
-def get_minimum_240p_m3u8(m3u8_url):
-    """Get minimum 240p stream from m3u8 playlist (ignore 144p)"""
-    print("🔍 Looking for minimum 240p quality in m3u8...")
+def is_remux_variant(stream):
+    """Check if a variant can skip the transcode (≤240p H.264/AAC)"""
+    if stream['height'] > 240:
+        return False
+    codecs = stream.get('codecs', '')
+    if not codecs:
+        return True  # VK serves H.264/AAC when CODECS is omitted
+    return all(c.strip().startswith(('avc1', 'mp4a')) for c in codecs.split(','))
+
+def score_variant(stream, throughput):
+    """Estimated seconds of work per second of video (fetch + transcode)"""
+    bandwidth = stream['bandwidth'] or stream['width'] * stream['height'] * 2  # rough bits/s guess
+    fetch_cost = (bandwidth / 8) / throughput
+    
+    if is_remux_variant(stream):
+        transcode_cost = 0.0
+    else:
+        frame_rate = stream.get('frame_rate') or 25.0
+        transcode_cost = stream['width'] * stream['height'] * frame_rate / DECODE_PIXEL_RATE
+    
+    return fetch_cost + transcode_cost
+
+def select_variant(streams):
+    """Pick the cheapest variant to fetch and transcode among those of at least 240p"""
+    throughput = get_link_throughput()
+    
+    print(f"📊 Available qualities (link ≈ {throughput / 1024:.0f} KB/s):")
+    for stream in sorted(streams, key=lambda x: (x['height'], x['bandwidth'])):
+        bandwidth_kbps = stream['bandwidth'] / 1000 if stream['bandwidth'] > 0 else 'N/A'
+        remux = " [remux]" if is_remux_variant(stream) else ""
+        print(f"  • {stream['height']}p (Bandwidth: {bandwidth_kbps}kbps, "
+              f"cost: {score_variant(stream, throughput):.3f}){remux}")
+    
+    # Minimum 240p: lower variants only compete when nothing reaches 240p
+    candidates = [s for s in streams if s['height'] >= 240]
+    if not candidates:
+        best = max(s['height'] for s in streams)
+        if best:
+            print(f"⚠️ Nothing reaches 240p (best is {best}p), selecting among lower variants as last resort")
+        else:
+            print("⚠️ Variants list no RESOLUTION, selecting by cost alone")
+        candidates = streams
+    
+    return min(candidates, key=lambda x: (score_variant(x, throughput), x['height']))
+
+# Duration / segment estimates of media playlists, keyed by URL
+HLS_ESTIMATES = {}
+
+def remember_hls_estimate(url, playlist):
+    """Cache total duration and segment count of a parsed media playlist"""
+    HLS_ESTIMATES[url] = {
+        'total_duration': playlist['total_duration'],
+        'segment_count': playlist['segment_count'],
+        'encrypted': playlist['encrypted'],
+        'endlist': playlist['endlist'],
+    }
+
+def estimate_video_job(url):
+    """Estimate duration and segment count of an HLS URL without fetching segments
+
+    Playlists already parsed during extraction are reused; anything else is
+    fetched once (a master playlist's first variant stands in for it).
+    """
+    if not url or '.m3u8' not in url:
+        return None
+    if url in HLS_ESTIMATES:
+        return HLS_ESTIMATES[url]
+    
+    playlist = fetch_candidate_playlist(url)
+    if playlist and playlist['type'] == 'master' and playlist['variants']:
+        variant_url = playlist['variants'][0]['url']
+        if variant_url in HLS_ESTIMATES:
+            HLS_ESTIMATES[url] = HLS_ESTIMATES[variant_url]
+            return HLS_ESTIMATES[url]
+        playlist = fetch_candidate_playlist(variant_url)
+        if playlist and playlist['type'] == 'media':
+            remember_hls_estimate(variant_url, playlist)
+    if not playlist or playlist['type'] != 'media':
+        print("⚠️ Cannot estimate playlist duration")
+        return None
+    
+    remember_hls_estimate(url, playlist)
+    return HLS_ESTIMATES[url]
+
+# Patterns for m3u8 URLs embedded in VK pages (JSON, escaped JSON, attributes)
+VK_VIDEO_PATTERNS = [
+    r'"hls":"([^"]+)"',
+    r'"url[0-9]+":"([^"]+)"',
+    r'video_url":"([^"]+)"',
+    r'src="([^"]+\.m3u8[^"]*)"',
+    r'\\"url\\":\\"([^\\\\"]+)\\"',
+]
+PLAYLIST_FETCH_WORKERS = 6
+
+def collect_m3u8_candidates(text):
+    """All m3u8 URLs in a page from every pattern, normalised and de-duplicated (page order)"""
+    candidates = []
+    for pattern in VK_VIDEO_PATTERNS:
+        for match in re.findall(pattern, text):
+            if not match or ('http' not in match and '.m3u8' not in match):
+                continue
+            url = fix_cdn_url(clean_vk_url(match))
+            if url and '.m3u8' in url and url not in candidates:
+                candidates.append(url)
+    return candidates
+
+def fetch_candidate_playlist(m3u8_url):
+    """Fetch one candidate playlist; returns the parsed playlist or None"""
+    # Add referer header for VK
+    headers = HEADERS.copy()
+    headers['Referer'] = 'https://vk.com/'
     
     try:
-        # Fix URL first
-        m3u8_url = clean_vk_url(m3u8_url)
-        m3u8_url = fix_cdn_url(m3u8_url)
-        
-        # Add referer header for VK
-        headers = HEADERS.copy()
-        headers['Referer'] = 'https://vk.com/'
-        
-        # Fetch the m3u8 playlist
         print(f"📥 Fetching playlist from: {m3u8_url[:100]}...")
-        response = requests.get(m3u8_url, headers=headers, timeout=30)
-        if response.status_code != 200:
-            print(f"⚠️ Failed to fetch playlist: HTTP {response.status_code}")
-            return m3u8_url
-        
-        m3u8_content = response.text
-        
-        # Check if this is a master playlist with multiple qualities
-        if '#EXT-X-STREAM-INF' in m3u8_content:
-            print("🎬 Found multiple qualities in master playlist")
-            
-            # Parse the playlist
-            lines = m3u8_content.split('\n')
-            streams = []
-            current_stream = {}
-            
-            for i, line in enumerate(lines):
-                if line.startswith('#EXT-X-STREAM-INF'):
-                    # Extract resolution
-                    res_match = re.search(r'RESOLUTION=(\d+)x(\d+)', line)
-                    if res_match:
-                        width = int(res_match.group(1))
-                        height = int(res_match.group(2))
-                        current_stream = {
-                            'height': height,
-                            'width': width,
-                            'bandwidth': 0,
-                            'url': None
-                        }
-                        
-                        # Extract bandwidth if available
-                        bw_match = re.search(r'BANDWIDTH=(\d+)', line)
-                        if bw_match:
-                            current_stream['bandwidth'] = int(bw_match.group(1))
-                
-                elif line and not line.startswith('#') and current_stream:
-                    current_stream['url'] = line.strip()
-                    
-                    # Make URL absolute if relative
-                    if not current_stream['url'].startswith('http'):
-                        base_url = '/'.join(m3u8_url.split('/')[:-1])
-                        current_stream['url'] = f"{base_url}/{current_stream['url']}"
-                    
-                    streams.append(current_stream.copy())
-                    current_stream = {}
-            
-            if streams:
-                # Sort by height (lowest first)
-                streams.sort(key=lambda x: x['height'])
-                
-                print(f"📊 Available qualities:")
-                for stream in streams:
-                    quality = f"{stream['height']}p"
-                    bandwidth_kbps = stream['bandwidth'] / 1000 if stream['bandwidth'] > 0 else 'N/A'
-                    print(f"  • {quality} (Bandwidth: {bandwidth_kbps}kbps)")
-                
-                # Strategy: Find minimum 240p or higher, ignore 144p
-                selected_stream = None
-                
-                # First, try to find 240p exactly
-                for stream in streams:
-                    if stream['height'] == 240:
-                        selected_stream = stream
-                        print(f"✅ Found exact 240p quality")
-                        break
-                
-                # If no 240p, find the next higher quality (ignoring 144p)
-                if not selected_stream:
-                    for stream in streams:
-                        if stream['height'] > 144:  # Ignore 144p
-                            selected_stream = stream
-                            print(f"⚠️ No 240p found, selecting {stream['height']}p (ignoring 144p)")
-                            break
-                
-                # If still no stream found (only 144p available), take 144p
-                if not selected_stream:
-                    selected_stream = streams[0]  # This will be 144p
-                    print(f"⚠️ Only 144p available, selecting it as last resort")
-                
-                print(f"✅ Selected: {selected_stream['height']}p")
-                return selected_stream['url']
+        count_request()
+        playlist, num_bytes, elapsed = hls.fetch_playlist(m3u8_url, headers=headers, timeout=30,
+                                                          limiter=host_limiter)
+        record_transfer(num_bytes, elapsed)
+        if not playlist:
+            print(f"⚠️ Failed to fetch playlist: {m3u8_url[:80]}")
+        return playlist
+    except Exception as e:
+        print(f"⚠️ Error fetching m3u8: {e}")
+        return None
+
+def get_minimum_240p_m3u8(m3u8_urls):
+    """Best stream across candidate m3u8 playlists (minimum 240p, ignore 144p)
+
+    Playlists are fetched concurrently; every variant of every master playlist
+    competes in select_variant. Falls back to the first media playlist, then
+    to the first candidate.
+    """
+    if isinstance(m3u8_urls, str):
+        m3u8_urls = [m3u8_urls]
+    
+    # Fix URLs first - different raw matches often normalise to the same URL
+    urls = []
+    for url in m3u8_urls:
+        url = fix_cdn_url(clean_vk_url(url))
+        if url and url not in urls:
+            urls.append(url)
+    if not urls:
+        return None
+    
+    print(f"🔍 Looking for minimum 240p quality in {len(urls)} playlist(s)...")
+    
+    with ThreadPoolExecutor(max_workers=min(PLAYLIST_FETCH_WORKERS, len(urls))) as executor:
+        # copy_context: keep per-item request counting in the worker threads
+        playlists = list(executor.map(
+            lambda url: contextvars.copy_context().run(fetch_candidate_playlist, url), urls))
+    
+    streams = []
+    seen = set()
+    first_media = None
+    for url, playlist in zip(urls, playlists):
+        if not playlist:
+            continue
+        if playlist['type'] == 'master':
+            for variant in playlist['variants']:
+                if variant['url'] not in seen:
+                    seen.add(variant['url'])
+                    streams.append(variant)
+        elif playlist['type'] == 'media':
+            remember_hls_estimate(url, playlist)
+            first_media = first_media or url
+    
+    if streams:
+        print(f"🎬 Found {len(streams)} qualities across {sum(1 for p in playlists if p)} playlist(s)")
         
-        return m3u8_url
+        # Variants without RESOLUTION can't be ranked by height
+        ranked = [v for v in streams if v['height']] or streams
         
-    except Exception as e:
-        print(f"⚠️ Error parsing m3u8: {e}")
-        return m3u8_url
+        selected_stream = select_variant(ranked)
+        print(f"✅ Selected: {selected_stream['height']}p")
+        return selected_stream['url']
+    
+    return first_media or urls[0]
+
+scraper_session = None
+
+# Per-host AIMD concurrency for VK pages, playlists and fragment downloads
+host_limiter = HostLimiter()
+
+def get_scraper():
+    """Shared cloudscraper session, reused across movies and jobs"""
+    global scraper_session
+    if scraper_session is None:
+        scraper_session = cloudscraper.create_scraper()
+    return scraper_session
 
 def extract_vk_video_url(video_page_url):
     """Extract video URL from VK.com specifically"""
     print("🔍 Using VK.com specific extractor...")
     
     try:
-        # Create a scraper to bypass Cloudflare
-        scraper = cloudscraper.create_scraper()
+        # Shared scraper to bypass Cloudflare (keeps clearance cookies warm)
+        scraper = get_scraper()
         
         # Fetch the page
         print("🌐 Fetching VK page...")
-        response = scraper.get(video_page_url, headers=HEADERS, timeout=30)
+        count_request()
+        response = host_limiter.get(scraper.get, video_page_url, headers=HEADERS, timeout=30)
         
         if response.status_code != 200:
             print(f"⚠️ HTTP {response.status_code}")
             return None
         
-        # Look for JSON data with video URLs
+        # Collect candidates from every pattern, then evaluate them together
         print("🔍 Searching for video URLs...")
-        
-        # Try to find video URLs in the page
-        video_patterns = [
-            r'"hls":"([^"]+)"',
-            r'"url[0-9]+":"([^"]+)"',
-            r'video_url":"([^"]+)"',
-            r'src="([^"]+\.m3u8[^"]*)"',
-            r'\\"url\\":\\"([^\\\\"]+)\\"',
-        ]
-        
-        for pattern in video_patterns:
-            matches = re.findall(pattern, response.text)
-            for match in matches:
-                if match and ('http' in match or '.m3u8' in match):
-                    url = clean_vk_url(match)
-                    url = fix_cdn_url(url)
-                    
-                    if url and '.m3u8' in url:
-                        print(f"🔧 Found m3u8 URL: {url[:80]}...")
-                        # Try to get minimum 240p quality from m3u8
-                        video_url = get_minimum_240p_m3u8(url)
-                        if video_url:
-                            return video_url
+        candidates = collect_m3u8_candidates(response.text)
+        if candidates:
+            print(f"🔧 Found {len(candidates)} unique m3u8 URL(s)")
+            video_url = get_minimum_240p_m3u8(candidates)
+            if video_url:
+                note_strategy("vk_page")
+                return video_url
         
         # Try to extract from iframe
         print("🔍 Searching for iframe...")
-        soup = BeautifulSoup(response.text, 'html.parser')
-        iframe = soup.find('iframe')
+        # Streaming scan that stops at the first iframe (no DOM of the whole page)
+        iframe_url = find_first_iframe(response.text)
         
-        if iframe and iframe.get('src'):
-            iframe_url = iframe['src']
-            if iframe_url.startswith('//'):
-                iframe_url = 'https:' + iframe_url
-            
+        if iframe_url:
             print(f"📺 Found iframe, checking content...")
             try:
-                iframe_response = scraper.get(iframe_url, headers=HEADERS, timeout=30)
+                count_request()
+                iframe_response = host_limiter.get(scraper.get, iframe_url, headers=HEADERS, timeout=30)
                 
                 # Search in iframe
-                for pattern in video_patterns:
-                    matches = re.findall(pattern, iframe_response.text)
-                    for match in matches:
-                        if match and ('http' in match or '.m3u8' in match):
-                            url = clean_vk_url(match)
-                            url = fix_cdn_url(url)
-                            if url and '.m3u8' in url:
-                                video_url = get_minimum_240p_m3u8(url)
-                                if video_url:
-                                    print(f"✅ Found URL in iframe")
-                                    return video_url
+                candidates = collect_m3u8_candidates(iframe_response.text)
+                if candidates:
+                    video_url = get_minimum_240p_m3u8(candidates)
+                    if video_url:
+                        print(f"✅ Found URL in iframe")
+                        note_strategy("vk_iframe")
+                        return video_url
             except Exception as e:
                 print(f"⚠️ Iframe error: {e}")
         
@@ -368,10 +478,12 @@ def extract_video_url(url):
             'socket_timeout': 30,
         }
         
+        count_request()
         with yt_dlp.YoutubeDL(ydl_opts) as ydl:
             info = ydl.extract_info(url, download=False)
             if info and 'url' in info:
                 video_url = info['url']
+                note_strategy("yt_dlp")
                 # Check if we got the right quality
                 if 'height' in info and info['height']:
                     print(f"✅ Found {info['height']}p URL via yt-dlp")
@@ -398,8 +510,12 @@ def download_with_ytdlp(url, output_path):
             'fragment_retries': 3,
             'skip_unavailable_fragments': True,
             'http_headers': HEADERS,
+            # Fragment parallelism follows the CDN host's AIMD window
+            'concurrent_fragment_downloads': host_limiter.limit(url),
+            'progress_hooks': [metrics.ytdlp_progress_hook()],
         }
         
+        download_start = time.time()
         with yt_dlp.YoutubeDL(ydl_opts) as ydl:
             print(f"🔗 Downloading from: {url[:100]}...")
             info = ydl.extract_info(url, download=True)
@@ -409,6 +525,8 @@ def download_with_ytdlp(url, output_path):
                 print(f"📊 Downloaded {info['height']}p quality")
             
         if os.path.exists(output_path):
+            host_limiter.record_success(url)
+            record_transfer(os.path.getsize(output_path), time.time() - download_start)
             file_size = os.path.getsize(output_path) / (1024 * 1024)
             print(f"✅ Download complete: {file_size:.1f} MB")
             return True
@@ -418,51 +536,162 @@ def download_with_ytdlp(url, output_path):
             
     except Exception as e:
         print(f"❌ yt-dlp download failed: {e}")
+        if is_throttle_error(e):
+            host_limiter.record_throttle(url, "download throttled")
         return False
 
+# Download watchdog: resume when throughput stays below the limit this long
+LOW_SPEED_LIMIT = int(os.environ.get("LOW_SPEED_LIMIT_KB", "50")) * 1024  # bytes/s
+LOW_SPEED_SECONDS = int(os.environ.get("LOW_SPEED_SECONDS", "30"))
+MAX_RESUMES = 10
+
+def parse_total_size(response, offset):
+    """Full file size from Content-Range (206) or Content-Length (200)"""
+    content_range = response.headers.get('content-range', '')
+    match = re.match(r'bytes\s+(\d+)-\d+/(\d+)', content_range)
+    if match:
+        return int(match.group(2))
+    length = int(response.headers.get('content-length', 0) or 0)
+    return offset + length if length else 0
+
+# Content types that are never the video itself
+NON_MEDIA_TYPES = {'application/vnd.apple.mpegurl', 'application/x-mpegurl', 'audio/mpegurl',
+                   'application/json', 'application/xml'}
+
 def download_alternative(url, output_path):
-    """Alternative download method using requests"""
+    """Alternative download method using requests (low-speed watchdog + Range resume)"""
     print("🔄 Using alternative download method...")
     
-    try:
+    downloaded = 0
+    total_size = 0
+    resumes = 0
+    completed = False
+    start_time = time.time()
+    chunk_size = 64 * 1024
+    next_report = 5 * 1024 * 1024
+    download_metrics = metrics.progress_tracker("download")
+    # Hash while writing, so the integrity gate doesn't re-read the file
+    hasher = hashlib.sha256()
+    
+    while resumes <= MAX_RESUMES and not completed:
         headers = HEADERS.copy()
-        response = requests.get(url, headers=headers, stream=True, timeout=30)
+        if downloaded:
+            headers['Range'] = f"bytes={downloaded}-"
+            print(f"↩️ Resuming from {downloaded / (1024*1024):.1f} MB (attempt {resumes}/{MAX_RESUMES})")
         
-        if response.status_code != 200:
-            print(f"❌ HTTP {response.status_code}")
-            return False
-        
-        total_size = int(response.headers.get('content-length', 0))
-        
-        print(f"📥 Downloading {total_size / (1024*1024):.1f} MB...")
-        
-        with open(output_path, 'wb') as f:
-            downloaded = 0
-            start_time = time.time()
-            chunk_size = 8192
+        try:
+            # Hold the host slot for the whole body, not just until the headers arrive
+            with host_limiter.slot(url):
+                # Read timeout catches connections that stop sending entirely
+                response = requests.get(url, headers=headers, stream=True, timeout=(30, LOW_SPEED_SECONDS))
+            
+                if downloaded and response.status_code == 200:
+                    print("⚠️ Server ignored Range, restarting from zero")
+                    downloaded = 0
+                    hasher = hashlib.sha256()
+                elif downloaded and response.status_code == 206 and \
+                        not response.headers.get('content-range', '').startswith(f"bytes {downloaded}-"):
+                    print("⚠️ Unexpected Content-Range, restarting from zero")
+                    response.close()
+                    downloaded = 0
+                    hasher = hashlib.sha256()
+                    resumes += 1
+                    continue
+                elif downloaded and response.status_code == 416 and total_size and downloaded >= total_size:
+                    completed = True
+                    break
+                elif response.status_code not in (200, 206):
+                    print(f"❌ HTTP {response.status_code}")
+                    host_limiter.record(url, response, None)
+                    if response.status_code < 500:
+                        return False
+                    resumes += 1
+                    continue
+            
+                # A playlist or error page is a complete body too - it must not count as the video
+                content_type = response.headers.get('content-type', '').split(';')[0].strip().lower()
+                if content_type in NON_MEDIA_TYPES or content_type.startswith('text/'):
+                    print(f"❌ Got {content_type}, not a video file")
+                    response.close()
+                    return False
+                
+                total_size = parse_total_size(response, downloaded) or total_size
+                if not downloaded:
+                    print(f"📥 Downloading {total_size / (1024*1024):.1f} MB...")
             
-            for chunk in response.iter_content(chunk_size=chunk_size):
-                if chunk:
-                    f.write(chunk)
-                    downloaded += len(chunk)
+                stalled = False
+                with open(output_path, 'ab' if downloaded else 'wb') as f:
+                    window_start = time.time()
+                    window_bytes = 0
+                
+                    for chunk in response.iter_content(chunk_size=chunk_size):
+                        if not chunk:
+                            continue
+                        f.write(chunk)
+                        hasher.update(chunk)
+                        downloaded += len(chunk)
+                        window_bytes += len(chunk)
+                        download_metrics(downloaded)
                     
-                    # Update progress every 5MB
-                    if downloaded % (5 * 1024 * 1024) < chunk_size:
-                        elapsed = time.time() - start_time
-                        speed = downloaded / elapsed / 1024 if elapsed > 0 else 0
-                        
-                        downloaded_mb = downloaded / (1024 * 1024)
-                        print(f"📥 {downloaded_mb:.1f} MB - {speed:.0f} KB/s")
-        
-        elapsed = time.time() - start_time
-        final_size = os.path.getsize(output_path) / (1024 * 1024)
-        print(f"✅ Alternative download complete: {final_size:.1f} MB in {elapsed:.1f}s")
-        
-        return final_size > 1
+                        # Update progress every 5MB
+                        if downloaded >= next_report:
+                            next_report += 5 * 1024 * 1024
+                            elapsed = time.time() - start_time
+                            speed = downloaded / elapsed / 1024 if elapsed > 0 else 0
+                            print(f"📥 {downloaded / (1024 * 1024):.1f} MB - {speed:.0f} KB/s")
+                    
+                        # Low-speed watchdog
+                        window_elapsed = time.time() - window_start
+                        if window_elapsed >= LOW_SPEED_SECONDS:
+                            if window_bytes / window_elapsed < LOW_SPEED_LIMIT:
+                                print(f"🐢 Below {LOW_SPEED_LIMIT // 1024} KB/s for {LOW_SPEED_SECONDS}s, reconnecting")
+                                stalled = True
+                                break
+                            window_start = time.time()
+                            window_bytes = 0
+            
+                response.close()
+            
+                # The window learns from the whole transfer, not just the response headers
+                if stalled:
+                    host_limiter.record_throttle(url, "low speed")
+                else:
+                    # Stream ended: complete only if it matches the advertised size
+                    completed = not total_size or downloaded >= total_size
+                    if completed:
+                        host_limiter.record_success(url)
+                    else:
+                        print(f"⚠️ Stream ended early ({downloaded}/{total_size} bytes)")
+            
+        except Exception as e:
+            print(f"⚠️ Connection error: {str(e)[:80]}")
         
-    except Exception as e:
-        print(f"❌ Alternative download failed: {e}")
+        if not completed:
+            resumes += 1
+    
+    elapsed = time.time() - start_time
+    record_transfer(downloaded, elapsed)
+    
+    if not completed or not os.path.exists(output_path):
+        print(f"❌ Alternative download failed after {resumes} resume(s)")
+        return False
+    
+    final_size = os.path.getsize(output_path)
+    if total_size and final_size != total_size:
+        print(f"❌ Size mismatch: {final_size} bytes on disk, {total_size} expected")
         return False
+    
+    remember_digest(output_path, hasher)
+    print(f"✅ Alternative download complete: {final_size / (1024 * 1024):.1f} MB in {elapsed:.1f}s")
+    return final_size > 0
+
+def download_source(url, output_path):
+    """yt-dlp first, the requests downloader as fallback"""
+    if download_with_ytdlp(url, output_path):
+        return True
+    # Try alternative method
+    print("🔄 Trying alternative download method...")
+    return download_alternative(url, output_path)
 
 def compress_to_240p(input_path, output_path):
     """Compress video to 240p with original settings"""
@@ -475,37 +704,41 @@ def compress_to_240p(input_path, output_path):
     input_size = os.path.getsize(input_path) / (1024 * 1024)
     print(f"📊 Input size: {input_size:.1f} MB")
     
-    # Check if already 240p or lower
-    try:
-        cmd = ['ffprobe', '-v', 'error', '-select_streams', 'v:0', 
-               '-show_entries', 'stream=height', '-of', 'csv=p=0:nk=1', input_path]
-        result = subprocess.run(cmd, capture_output=True, text=True)
-        if result.returncode == 0:
-            height = result.stdout.strip()
-            if height.isdigit() and int(height) <= 240:
-                print(f"📊 Video is already {height}p, copying without compression")
-                shutil.copy2(input_path, output_path)
-                return True
-    except:
-        pass
+    # Compress using the active encoding profile (see encoding_profiles.py)
+    profile = load_profile()
+    print(f"🎛️ Profile: {describe_profile(profile)}")
+    
+    # Preflight: sample encode to decide if a full transcode is worth it
+    plan = plan_compression(input_path, profile)
+    print_plan(plan)
+    
+    if plan['action'] == ACTION_PASSTHROUGH:
+        print("📊 Using input without compression")
+        start_time = time.time()
+        place_file(input_path, output_path)
+        log_outcome(plan, output_path, time.time() - start_time)
+        return True
+    
+    if plan['action'] == ACTION_REMUX:
+        print("📦 Remuxing to mp4 without re-encoding...")
+        start_time = time.time()
+        if remux_to_mp4(input_path, output_path):
+            log_outcome(plan, output_path, time.time() - start_time)
+            return True
+        print("⚠️ Remux failed, falling back to transcode")
     
-    # Compress using same settings as original script
     cmd = [
         'ffmpeg',
         '-i', input_path,
         '-vf', 'scale=-2:240',  # Scale to 240p height
-        '-c:v', 'libx264',
-        '-crf', '28',  # Same as original
-        '-preset', 'veryfast',  # Same as original
-        '-c:a', 'aac',
-        '-b:a', '64k',  # Same as original
+        *build_encode_args(profile),
         '-y',
         output_path
     ]
     
     print("🔄 Starting compression...")
     start_time = time.time()
-    result = subprocess.run(cmd, capture_output=True, text=True, timeout=3600)  # 1 hour timeout
+    result = run_ffmpeg(cmd, timeout=3600, on_progress=metrics.encode_progress_tracker())  # 1 hour timeout
     
     elapsed = time.time() - start_time
     
@@ -515,49 +748,23 @@ def compress_to_240p(input_path, output_path):
         
         print(f"✅ Compression complete in {elapsed:.1f}s")
         print(f"📊 Output size: {output_size:.1f} MB (-{reduction:.1f}%)")
+        log_outcome(plan, output_path, elapsed)
         
         # Verify output file
         if output_size < 1:  # Less than 1MB
             print("⚠️ Output file too small, using input file")
-            shutil.copy2(input_path, output_path)
+            place_file(input_path, output_path)
         
         return True
     else:
         print("❌ Compression failed, using original file")
+        if result.stalled:
+            print("🧊 Encode stalled and was stopped")
         if result.stderr:
-            print(f"Error: {result.stderr[:200]}")
-        shutil.copy2(input_path, output_path)
+            print(f"Error: {result.stderr[-500:]}")
+        place_file(input_path, output_path)
         return True
 
-def create_thumbnail(input_file, thumbnail_path):
-    """Create thumbnail from video"""
-    try:
-        print(f"🖼️ Creating thumbnail...")
-        
-        cmd = [
-            'ffmpeg',
-            '-i', input_file,
-            '-ss', '00:00:05',
-            '-vframes', '1',
-            '-s', '320x180',
-            '-f', 'image2',
-            '-y',
-            thumbnail_path
-        ]
-        
-        result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
-        
-        if result.returncode == 0 and os.path.exists(thumbnail_path):
-            size = os.path.getsize(thumbnail_path) / 1024
-            print(f"✅ Thumbnail created ({size:.1f}KB)")
-            return True
-        
-        return False
-        
-    except Exception as e:
-        print(f"❌ Thumbnail error: {e}")
-        return False
-
 def get_video_dimensions(input_file):
     """Get video dimensions"""
     try:
@@ -599,7 +806,7 @@ def get_video_duration(input_file):
     
     return 0
 
-async def upload_to_telegram(file_path, caption, thumbnail_path=None):
+async def upload_to_telegram(file_path, caption, thumbnail_path=None, chat_id=None):
     """Upload to Telegram channel with enhanced settings"""
     print(f"☁️ Uploading: {os.path.basename(file_path)}")
     
@@ -616,7 +823,7 @@ async def upload_to_telegram(file_path, caption, thumbnail_path=None):
         
         # Prepare upload parameters
         upload_params = {
-            'chat_id': TELEGRAM_CHANNEL,
+            'chat_id': chat_id or TELEGRAM_CHANNEL,
             'video': file_path,
             'caption': caption,
             'supports_streaming': True,
@@ -637,9 +844,11 @@ async def upload_to_telegram(file_path, caption, thumbnail_path=None):
         # Upload with progress
         start_time = time.time()
         last_percent = 0
+        upload_metrics = metrics.progress_tracker("upload")
         
         def progress(current, total):
             nonlocal last_percent
+            upload_metrics(current)
             percent = (current / total) * 100
             if percent - last_percent >= 10 or percent == 100:
                 speed = current / (time.time() - start_time) / 1024 if (time.time() - start_time) > 0 else 0
@@ -657,7 +866,7 @@ async def upload_to_telegram(file_path, caption, thumbnail_path=None):
     except FloodWait as e:
         print(f"⏳ Flood wait: {e.value} seconds")
         await asyncio.sleep(e.value)
-        return await upload_to_telegram(file_path, caption, thumbnail_path)
+        return await upload_to_telegram(file_path, caption, thumbnail_path, chat_id)
     except Exception as e:
         print(f"❌ Upload failed: {e}")
         # Try without progress
@@ -671,7 +880,53 @@ async def upload_to_telegram(file_path, caption, thumbnail_path=None):
             print(f"❌ Retry failed: {e2}")
             return False
 
-async def process_movie(video_url, video_title):
+# Batch concurrency (overridable from video_config.json)
+DEFAULT_MAX_CONCURRENT = 2
+DEFAULT_ENCODE_SLOTS = 1
+encode_semaphore = None
+
+async def compress_in_slot(input_path, output_path):
+    """Run compress_to_240p in a worker thread, limited to the configured encode slots"""
+    if encode_semaphore is None:
+        return await asyncio.to_thread(compress_to_240p, input_path, output_path)
+    async with encode_semaphore:
+        with metrics.stage("encode"):
+            return await asyncio.to_thread(compress_to_240p, input_path, output_path)
+
+# Renditions to produce (video_config.json "output_ladder", e.g. [240, 360])
+OUTPUT_LADDER = parse_output_ladder(None, TELEGRAM_CHANNEL)
+
+async def process_ladder(work, source_file, caption):
+    """Encode the output ladder from a single decode and upload each rendition to its channel"""
+    outputs = [(r['height'], work.file(f"movie_{r['height']}p.mp4")) for r in OUTPUT_LADDER]
+    
+    print(f"3️⃣ Encoding renditions: {', '.join(f'{h}p' for h, _ in outputs)}")
+    async with encode_semaphore:
+        with metrics.stage("encode"):
+            status = await asyncio.to_thread(
+                encode_ladder, source_file, outputs, None, metrics.encode_progress_tracker(), 3600)
+    
+    ready = [(r, path) for r, (height, path) in zip(OUTPUT_LADDER, outputs) if status.get(height)]
+    if not ready:
+        return False, "Compression failed"
+    
+    print("4️⃣ Creating thumbnail...")
+    thumbnail_file = work.small_file("thumbnail.jpg")
+    thumb = thumbnail_file if await asyncio.to_thread(create_thumbnail, ready[0][1], thumbnail_file) else None
+    
+    print("5️⃣ Uploading renditions to Telegram...")
+    with metrics.stage("upload"):
+        results = await asyncio.gather(*[
+            upload_in_parts(upload_to_telegram, work, path, caption, thumb, chat_id=rendition['channel'])
+            for rendition, path in ready
+        ])
+    
+    uploaded = [f"{r['height']}p→{r['channel']}" for (r, _), ok in zip(ready, results) if ok]
+    if len(uploaded) < len(OUTPUT_LADDER):
+        return False, f"Uploaded {len(uploaded)}/{len(OUTPUT_LADDER)} renditions: {', '.join(uploaded) or 'none'}"
+    return True, f"✅ Movie processed successfully ({', '.join(uploaded)})"
+
+async def process_movie(video_url, video_title, index=1):
     """Process a single movie - download minimum 240p then compress"""
     print(f"\n{'─'*50}")
     print(f"🎬 Processing: {video_title}")
@@ -680,103 +935,184 @@ async def process_movie(video_url, video_title):
     print(f"🔗 URL: {video_url}")
     print(f"{'─'*50}")
     
-    # Create temp directory
+    # Temp directory (one per movie, so concurrent movies don't collide),
+    # removed on success and on failure
     timestamp = datetime.now().strftime('%H%M%S')
-    temp_dir = f"temp_movie_{timestamp}"
-    os.makedirs(temp_dir, exist_ok=True)
-    
-    # Define file paths
-    temp_file = os.path.join(temp_dir, "temp_video.mp4")
-    final_file = os.path.join(temp_dir, "movie_240p.mp4")
-    thumbnail_file = os.path.join(temp_dir, "thumbnail.jpg")
-    
-    try:
-        # Step 1: Extract URL
-        print("1️⃣ Extracting video URL (minimum 240p)...")
-        direct_url = extract_video_url(video_url)
-        
-        if not direct_url:
-            print("❌ Failed to extract video URL")
-            return False, "URL extraction failed"
-        
-        print(f"✅ Found URL: {direct_url[:100]}...")
-        
-        # Step 2: Download using yt-dlp (minimum 240p)
-        print("2️⃣ Downloading (minimum 240p quality)...")
-        if not download_with_ytdlp(direct_url, temp_file):
-            # Try alternative method
-            print("🔄 Trying alternative download method...")
-            if not download_alternative(direct_url, temp_file):
-                return False, "Download failed"
-        
-        # Check downloaded file
-        if not os.path.exists(temp_file) or os.path.getsize(temp_file) < 1024:
-            return False, "Downloaded file is invalid"
-        
-        # Step 3: Check quality and compress to 240p if needed
-        print("3️⃣ Checking video quality...")
-        
+    with WorkDir(f"temp_movie_{index:02d}_{timestamp}") as work:
+        # Define file paths
+        temp_file = work.file("temp_video.mp4")
+        final_file = work.file("movie_240p.mp4")
+        thumbnail_file = work.small_file("thumbnail.jpg")
+            
         try:
-            cmd = ['ffprobe', '-v', 'error', '-select_streams', 'v:0', 
-                   '-show_entries', 'stream=height', '-of', 'csv=p=0:nk=1', temp_file]
-            result = subprocess.run(cmd, capture_output=True, text=True)
-            if result.returncode == 0:
-                height = result.stdout.strip()
-                if height.isdigit():
-                    print(f"📊 Downloaded video is {height}p")
-                    
-                    if int(height) <= 240:
-                        print(f"✅ Video is already {height}p or lower, no compression needed")
-                        final_file = temp_file
+            # Step 1: Extract URL
+            print("1️⃣ Extracting video URL (minimum 240p)...")
+            with metrics.stage("resolve"):
+                direct_url = await asyncio.to_thread(extract_video_url, video_url)
+            
+            if not direct_url:
+                print("❌ Failed to extract video URL")
+                return False, "URL extraction failed"
+            
+            print(f"✅ Found URL: {direct_url[:100]}...")
+            
+            estimate = await asyncio.to_thread(estimate_video_job, direct_url)
+            if estimate:
+                print(f"⏱️ Estimated duration: {estimate['total_duration'] / 60:.1f} min "
+                      f"({estimate['segment_count']} segments)")
+            
+            # Step 2: Download using yt-dlp (minimum 240p)
+            print("2️⃣ Downloading (minimum 240p quality)...")
+            # Integrity gate: a truncated/corrupt file goes back to the downloader, never to the encoder
+            expected_duration = estimate['total_duration'] if estimate else None
+            with metrics.stage("download"):
+                downloaded, report = await asyncio.to_thread(
+                    download_verified, download_source, direct_url, temp_file, expected_duration)
+            if not downloaded:
+                return False, report
+            
+            # Output ladder: every rendition from one decode, one upload per channel
+            if OUTPUT_LADDER:
+                return await process_ladder(work, temp_file, video_title)
+            
+            # Step 3: Check quality and compress to 240p if needed
+            print("3️⃣ Checking video quality...")
+            
+            try:
+                cmd = ['ffprobe', '-v', 'error', '-select_streams', 'v:0', 
+                       '-show_entries', 'stream=height', '-of', 'csv=p=0:nk=1', temp_file]
+                result = subprocess.run(cmd, capture_output=True, text=True)
+                if result.returncode == 0:
+                    height = result.stdout.strip()
+                    if height.isdigit():
+                        print(f"📊 Downloaded video is {height}p")
+                        
+                        if int(height) <= 240:
+                            print(f"✅ Video is already {height}p or lower, no compression needed")
+                            final_file = temp_file
+                        else:
+                            print("🎬 Compressing to 240p...")
+                            if not await compress_in_slot(temp_file, final_file):
+                                return False, "Compression failed"
                     else:
-                        print("🎬 Compressing to 240p...")
-                        if not compress_to_240p(temp_file, final_file):
+                        print("⚠️ Could not determine video height, trying compression...")
+                        if not await compress_in_slot(temp_file, final_file):
                             return False, "Compression failed"
                 else:
-                    print("⚠️ Could not determine video height, trying compression...")
-                    if not compress_to_240p(temp_file, final_file):
+                    print("⚠️ Could not check video height, trying compression...")
+                    if not await compress_in_slot(temp_file, final_file):
                         return False, "Compression failed"
-            else:
-                print("⚠️ Could not check video height, trying compression...")
-                if not compress_to_240p(temp_file, final_file):
+            except:
+                print("⚠️ Error checking video quality, trying compression...")
+                if not await compress_in_slot(temp_file, final_file):
                     return False, "Compression failed"
-        except:
-            print("⚠️ Error checking video quality, trying compression...")
-            if not compress_to_240p(temp_file, final_file):
-                return False, "Compression failed"
-        
-        # Verify final file
-        if not os.path.exists(final_file) or os.path.getsize(final_file) < 1024:
-            print("⚠️ Final file issue, using temp file")
-            final_file = temp_file
-        
-        # Step 4: Create thumbnail
-        print("4️⃣ Creating thumbnail...")
-        thumbnail_created = create_thumbnail(final_file, thumbnail_file)
-        
-        # Step 5: Upload
-        print("5️⃣ Uploading to Telegram...")
-        thumb = thumbnail_file if thumbnail_created and os.path.exists(thumbnail_file) else None
+            
+            # Verify final file
+            if not os.path.exists(final_file) or os.path.getsize(final_file) < 1024:
+                print("⚠️ Final file issue, using temp file")
+                final_file = temp_file
+            
+            # Step 4: Create thumbnail
+            print("4️⃣ Creating thumbnail...")
+            thumbnail_created = await asyncio.to_thread(create_thumbnail, final_file, thumbnail_file)
+            
+            # Step 5: Upload
+            print("5️⃣ Uploading to Telegram...")
+            thumb = thumbnail_file if thumbnail_created and os.path.exists(thumbnail_file) else None
+            
+            with metrics.stage("upload"):
+                uploaded = await upload_in_parts(upload_to_telegram, work, final_file, video_title, thumb)
+            if not uploaded:
+                return False, "Upload failed"
+            
+            print("🗑️ Cleaning temp files")
+            return True, "✅ Movie processed successfully"
+            
+        except Exception as e:
+            return False, f"Error: {str(e)}"
+
+async def run_movies(config):
+    """Process one movie batch config (Telegram must already be connected); returns (successful, total)"""
+    videos = config.get("videos", [])
+    if not videos:
+        print("❌ No videos in config")
+        return 0, 0
+    
+    print(f"\n📊 Found {len(videos)} video(s) to process")
+    
+    global encode_semaphore, OUTPUT_LADDER
+    OUTPUT_LADDER = parse_output_ladder(config.get("output_ladder"), TELEGRAM_CHANNEL)
+    if OUTPUT_LADDER:
+        heights = ', '.join(f"{r['height']}p" for r in OUTPUT_LADDER)
+        print(f"🪜 Output ladder: {heights}")
+    max_concurrent = max(1, int(config.get("max_concurrent", DEFAULT_MAX_CONCURRENT)))
+    encode_slots = max(1, int(config.get("encode_slots", DEFAULT_ENCODE_SLOTS)))
+    encode_semaphore = asyncio.Semaphore(encode_slots)
+    movie_semaphore = asyncio.Semaphore(max_concurrent)
+    
+    print(f"⚙️ Concurrency: {max_concurrent} movie(s) at once, {encode_slots} encode slot(s)")
+    
+    async def run_movie(index, video):
+        url = video.get("url", "").strip()
+        title = video.get("title", "").strip()
         
-        if not await upload_to_telegram(final_file, video_title, thumb):
-            return False, "Upload failed"
+        if not url or not title:
+            print(f"⚠️ Skipping video {index}: Missing data")
+            metrics.add_gauge("queue_depth", -1, stage="pending", state="waiting")
+            metrics.item_finished(False)
+            return {'index': index, 'title': title or url, 'success': False,
+                    'message': "Missing data", 'elapsed': 0.0}
         
-        # Cleanup
-        try:
-            shutil.rmtree(temp_dir)
-            print("🗑️ Cleaned temp files")
-        except:
-            pass
+        async with movie_semaphore:
+            metrics.add_gauge("queue_depth", -1, stage="pending", state="waiting")
+            print(f"\n[🎬 Video {index}/{len(videos)}] {title}")
+            start_time = time.time()
+            try:
+                success, message = await process_movie(url, title, index)
+            except Exception as e:
+                success, message = False, f"Error: {e}"
+            elapsed = time.time() - start_time
+            metrics.item_finished(success)
             
-        return True, "✅ Movie processed successfully"
-        
-    except Exception as e:
-        # Cleanup on error
-        try:
-            shutil.rmtree(temp_dir, ignore_errors=True)
-        except:
-            pass
-        return False, f"Error: {str(e)}"
+            if success:
+                print(f"✅ [{index}] {message}")
+            else:
+                print(f"❌ [{index}] {message}")
+            
+            return {'index': index, 'title': title, 'success': success,
+                    'message': message, 'elapsed': elapsed}
+    
+    # Process videos
+    metrics.set_waiting(len(videos))
+    batch_start = time.time()
+    results = await asyncio.gather(*[run_movie(index, video) for index, video in enumerate(videos, 1)])
+    batch_elapsed = time.time() - batch_start
+    successful = sum(1 for r in results if r['success'])
+    
+    # Summary
+    print(f"\n{'='*50}")
+    print("📊 Batch Summary")
+    print('='*50)
+    for r in results:
+        status = "✅" if r['success'] else "❌"
+        print(f"{status} [{r['index']}] {r['title']} - {r['message']} ({r['elapsed']:.0f}s)")
+    
+    sequential_time = sum(r['elapsed'] for r in results)
+    print(f"\n📊 Result: {successful}/{len(videos)} successful")
+    print(f"⏱️ Batch time: {batch_elapsed:.0f}s (sum of movie times: {sequential_time:.0f}s)")
+    for line in host_limiter.describe():
+        print(f"🚦 Host {line}")
+    
+    if successful == len(videos):
+        print("🎉 All videos processed successfully!")
+    elif successful > 0:
+        print(f"⚠️ Partially successful ({successful}/{len(videos)})")
+    else:
+        print("💥 All videos failed!")
+    
+    print("🏁 Processing complete")
+    
+    return successful, len(videos)
 
 async def main():
     """Main function"""
@@ -787,6 +1123,8 @@ async def main():
     print("🔧 Enhanced upload settings")
     print("="*50)
     
+    metrics.start_server()
+    
     # Check ffmpeg
     try:
         subprocess.run(['ffmpeg', '-version'], capture_output=True, check=True)
@@ -805,6 +1143,8 @@ async def main():
     if not os.path.exists(config_file):
         print("❌ Config file not found, creating sample...")
         sample_config = {
+            "max_concurrent": DEFAULT_MAX_CONCURRENT,
+            "encode_slots": DEFAULT_ENCODE_SLOTS,
             "videos": [{
                 "url": "https://vk.com/video_ext.php?oid=791768803&id=456249035",
                 "title": "اكس مراتي - الفيلم الكامل"
@@ -823,56 +1163,36 @@ async def main():
         print(f"❌ Error reading config: {e}")
         return
     
-    videos = config.get("videos", [])
-    if not videos:
-        print("❌ No videos in config")
-        return
-    
-    print(f"\n📊 Found {len(videos)} video(s) to process")
-    
-    # Process videos
-    successful = 0
-    for index, video in enumerate(videos, 1):
-        url = video.get("url", "").strip()
-        title = video.get("title", "").strip()
-        
-        if not url or not title:
-            print(f"⚠️ Skipping video {index}: Missing data")
-            continue
-        
-        print(f"\n[🎬 Video {index}/{len(videos)}] {title}")
-        success, message = await process_movie(url, title)
-        
-        if success:
-            successful += 1
-            print(f"✅ {message}")
-        else:
-            print(f"❌ {message}")
-        
-        # Wait between videos
-        if index < len(videos):
-            print("⏳ Waiting 5 seconds before next video...")
-            await asyncio.sleep(5)
-    
-    # Summary
-    print(f"\n{'='*50}")
-    print(f"📊 Result: {successful}/{len(videos)} successful")
-    
-    if successful == len(videos):
-        print("🎉 All videos processed successfully!")
-    elif successful > 0:
-        print(f"⚠️ Partially successful ({successful}/{len(videos)})")
-    else:
-        print("💥 All videos failed!")
-    
-    print("🏁 Processing complete")
+    await run_movies(config)
     
     # Cleanup
     if app:
         await app.stop()
         print("🔌 Disconnected from Telegram")
 
-if __name__ == "__main__":
+async def resolve_only(argv):
+    """Dry run: resolve movie URLs concurrently and print a benchmark table"""
+    parser = argparse.ArgumentParser(description="Resolve movie URLs only (no download/encode/upload)")
+    parser.add_argument("--resolve-only", action="store_true")
+    parser.add_argument("urls", nargs="*", help="page URLs (default: videos in video_config.json)")
+    parser.add_argument("--concurrency", type=int, default=4)
+    args = parser.parse_args(argv)
+    
+    urls = list(args.urls)
+    if not urls and os.path.exists("video_config.json"):
+        with open("video_config.json", 'r', encoding='utf-8') as f:
+            urls = [v.get("url", "").strip() for v in json.load(f).get("videos", []) if v.get("url")]
+    if not urls:
+        print("❌ No URLs to resolve")
+        return
+    
+    print(f"🔍 Resolve-only: {len(urls)} URL(s), concurrency {args.concurrency}")
+    rows, wall = await resolve_all(urls, extract_video_url, args.concurrency)
+    print_table(rows, wall)
+
+if __name__ == "__main__" and RESOLVE_ONLY:
+    asyncio.run(resolve_only(sys.argv[1:]))
+elif __name__ == "__main__":
     try:
         asyncio.run(main())
     except KeyboardInterrupt:
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Working-file manager - copy-free file placement, optional tmpfs staging
+for small intermediates, and cleanup on both success and failure
+"""
+
+import os
+import shutil
+import tempfile
+
+# Stage small intermediates (thumbnails, sample clips) in RAM when possible
+TMPFS_ROOT = os.environ.get("WORK_TMPFS", "/dev/shm")
+TMPFS_MAX_BYTES = int(os.environ.get("WORK_TMPFS_MAX_MB", "64")) * 1024 * 1024
+
+
+def tmpfs_available():
+    """Is the tmpfs staging area usable?"""
+    return TMPFS_ROOT not in ("", "0") and os.path.isdir(TMPFS_ROOT) and os.access(TMPFS_ROOT, os.W_OK)
+
+
+def staging_root(expected_bytes=0):
+    """Directory for a small intermediate file (tmpfs if it fits, else None = default temp)"""
+    if expected_bytes <= TMPFS_MAX_BYTES and tmpfs_available():
+        try:
+            free = shutil.disk_usage(TMPFS_ROOT).free
+            if free > expected_bytes * 2 + TMPFS_MAX_BYTES:
+                return TMPFS_ROOT
+        except OSError:
+            pass
+    return None
+
+
+def make_temp_dir(prefix, expected_bytes=0):
+    """mkdtemp on tmpfs when the contents are small enough"""
+    return tempfile.mkdtemp(prefix=prefix, dir=staging_root(expected_bytes))
+
+
+def remove_file(path):
+    try:
+        if os.path.lexists(path):
+            os.remove(path)
+    except OSError:
+        pass
+
+
+def place_file(src, dst, keep_source=True):
+    """Make dst hold src's data without copying
+
+    keep_source=True  -> hardlink (both names stay valid)
+    keep_source=False -> rename
+    Falls back to a copy/move only across filesystems.
+    """
+    if os.path.abspath(src) == os.path.abspath(dst):
+        return dst
+    remove_file(dst)
+
+    if keep_source:
+        try:
+            os.link(src, dst)
+            return dst
+        except OSError:
+            print(f"⚠️ Cannot hardlink {os.path.basename(src)}, copying")
+            shutil.copy2(src, dst)
+            return dst
+
+    try:
+        os.replace(src, dst)
+    except OSError:
+        shutil.move(src, dst)
+    return dst
+
+
+class WorkDir:
+    """Per-job working directory, removed on exit whatever happened"""
+
+    def __init__(self, name, base="."):
+        self.path = os.path.join(base, name)
+        os.makedirs(self.path, exist_ok=True)
+        self.staging = None
+        self.keep = False
+
+    def file(self, name):
+        """Path for a large working file (same filesystem, so renames/links are free)"""
+        return os.path.join(self.path, name)
+
+    def small_file(self, name):
+        """Path for a small intermediate, staged on tmpfs when available"""
+        if self.staging is None:
+            root = staging_root()
+            self.staging = tempfile.mkdtemp(prefix="stage_", dir=root) if root else self.path
+        return os.path.join(self.staging, name)
+
+    def cleanup(self):
+        if self.staging and self.staging != self.path:
+            shutil.rmtree(self.staging, ignore_errors=True)
+        if not self.keep:
+            shutil.rmtree(self.path, ignore_errors=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.cleanup()
+        return False